@@ -1,8 +1,12 @@
+import math
+from array import array
 from functools import lru_cache
 
-@lru_cache(maxsize=128)
-def change_money(total, max_coin=5):
+@lru_cache(maxsize=None)
+def change_money_recursive(total, max_coin=5):
     """
+    递归解法（每用一枚硬币递归一层，金额较大时会超过递归深度限制，请使用 change_money）
+
     现有2元、3元、5元共三种面额的货币，如果需要找零99元，一共有多少种找零的方式？
     
     参数:
@@ -10,13 +14,13 @@ def change_money(total, max_coin=5):
     max_coin: 当前允许使用的最大面额（避免顺序重复）
 
     分解为3个子问题（按硬币面额从大到小）：
-        - coin=5 ：调用 change_money(5, 5) （剩余金额5，最大面额5）
-        - coin=3 ：调用 change_money(7, 3) （剩余金额7，最大面额3）
-        - coin=2 ：调用 change_money(8, 2) （剩余金额8，最大面额2）
+        - coin=5 ：调用 change_money_recursive(5, 5) （剩余金额5，最大面额5）
+        - coin=3 ：调用 change_money_recursive(7, 3) （剩余金额7，最大面额3）
+        - coin=2 ：调用 change_money_recursive(8, 2) （剩余金额8，最大面额2）
 
-    - coin=5 ：使用1个5元后，剩余金额 10-5=5 ，后续只能用 ≤5元的硬币（即5、3、2元），因此调用 change_money(5, 5) 。
-    - coin=3 ：使用1个3元后，剩余金额 10-3=7 ，后续只能用 ≤3元的硬币（即3、2元），因此调用 change_money(7, 3) 。
-    - coin=2 ：使用1个2元后，剩余金额 10-2=8 ，后续只能用 ≤2元的硬币（即2元），因此调用 change_money(8, 2) 。
+    - coin=5 ：使用1个5元后，剩余金额 10-5=5 ，后续只能用 ≤5元的硬币（即5、3、2元），因此调用 change_money_recursive(5, 5) 。
+    - coin=3 ：使用1个3元后，剩余金额 10-3=7 ，后续只能用 ≤3元的硬币（即3、2元），因此调用 change_money_recursive(7, 3) 。
+    - coin=2 ：使用1个2元后，剩余金额 10-2=8 ，后续只能用 ≤2元的硬币（即2元），因此调用 change_money_recursive(8, 2) 。
     通过这种拆分方式，函数确保了硬币的使用顺序是 从大到小 （例如，先5元后3元，不会出现先3元后5元的重复组合），从而避免了重复计数，保证了结果的准确性。
     """
     if total == 0:
@@ -30,9 +34,198 @@ def change_money(total, max_coin=5):
     for coin in coins:
         # 只使用不超过当前最大面额的硬币
         if coin <= max_coin:
-            ways += change_money(total - coin, coin)
+            ways += change_money_recursive(total - coin, coin)
     return ways
 
+
+@lru_cache(maxsize=1024)
+def _count_change(total, coins):
+    """
+    滚动一维数组计数，O(total) 内存，没有递归
+    结果按 (total, coins) 缓存，重复查询不再计算
+    """
+    if total < 0:
+        return 0
+    dp = [0] * (total + 1)
+    dp[0] = 1
+    for coin in coins:
+        for amount in range(coin, total + 1):
+            dp[amount] += dp[amount - coin]
+    return dp[total]
+
+
+def change_money(total, max_coin=None, coins=(5, 3, 2)):
+    """
+    迭代解法，支持任意面额和上百万的金额
+
+    参数:
+    total: 找零金额
+    max_coin: 允许使用的最大面额，为 None 时不限制
+    coins: 面额列表
+
+    缓存统计: change_money.cache_info()，清空: change_money.cache_clear()
+    """
+    usable = tuple(sorted(c for c in set(coins) if max_coin is None or c <= max_coin))
+    return _count_change(total, usable)
+
+
+change_money.cache_info = _count_change.cache_info
+change_money.cache_clear = _count_change.cache_clear
+
+
+class ChangeFormula:
+    """
+    固定面额的找零计数公式（拟多项式），适合 10^12 这样的大金额
+
+    设 L 为所有面额的最小公倍数、k 为面额种数，则对每个余数 r（0 <= r < L），
+    找零 n = r + L*q 的方式数量是 q 的 k-1 次多项式。
+    预先用 dp 求出每个余数类在 q = 0..k-1 处的值并做前向差分 Δ^m，查询时按牛顿插值公式
+        count(n) = Σ Δ^m · C(q, m)   (m = 0..k-1)
+    全部为整数运算，每次查询 O(k^2) 次大整数运算，与金额大小无关。
+
+    例如 coins=[2, 3, 5]：L=30，只需要 dp 到 90，就能回答任意金额。
+
+    参数:
+    coins: 面额列表
+    max_table: 预计算 dp 表的最大长度 L*k，超出时抛出 ValueError（可改用 count_change_bostan_mori）
+    """
+
+    def __init__(self, coins, max_table=1_000_000):
+        coins = sorted(set(coins))
+        if not coins or coins[0] <= 0:
+            raise ValueError("coins must be a non-empty list of positive integers")
+        self.coins = tuple(coins)
+        self.period = math.lcm(*coins)
+        degree = len(coins)  # 每个余数类需要的采样点数
+        if self.period * degree > max_table:
+            raise ValueError(f"lcm of coins is too large ({self.period}), use count_change_bostan_mori")
+
+        table = ChangeCounter(coins).count_many(range(self.period * degree))
+        self._differences = []
+        for r in range(self.period):
+            values = [table[r + self.period * q] for q in range(degree)]
+            differences = []
+            for _ in range(degree):
+                differences.append(values[0])
+                values = [b - a for a, b in zip(values, values[1:])]
+            self._differences.append(differences)
+
+    def count(self, target, modulus=None):
+        """找零金额 target 的方式数量，modulus 不为 None 时返回取模结果"""
+        if target < 0:
+            return 0
+        q, r = divmod(target, self.period)
+        ways = 0
+        binomial = 1  # C(q, m)
+        for m, delta in enumerate(self._differences[r]):
+            if m:
+                binomial = binomial * (q - m + 1) // m
+            ways += delta * binomial
+        return ways % modulus if modulus else ways
+
+    def verify(self, upto=None):
+        """
+        与 dp 结果逐个比对 0..upto，默认比对到 4 个周期之外
+        不一致时抛出 AssertionError
+        """
+        upto = upto if upto is not None else self.period * (len(self.coins) + 4)
+        expected = ChangeCounter(self.coins).count_many(range(upto + 1))
+        for target, ways in enumerate(expected):
+            if self.count(target) != ways:
+                raise AssertionError(f"formula mismatch at {target}: {self.count(target)} != {ways}")
+        return True
+
+
+def _multiply(a, b, modulus=None):
+    """多项式乘法（系数列表，跳过零系数）"""
+    result = [0] * (len(a) + len(b) - 1)
+    for i, x in enumerate(a):
+        if x:
+            for j, y in enumerate(b):
+                if y:
+                    result[i + j] += x * y
+    if modulus:
+        result = [v % modulus for v in result]
+    return result
+
+
+def count_change_bostan_mori(target, coins, modulus=None):
+    """
+    用 Bostan–Mori 算法求生成函数 1 / Π(1 - x^c) 的第 target 项系数
+
+    每一步把 P(x)/Q(x) 的分子分母同乘 Q(-x)，分母变成只含偶次项的 V(x^2)，
+    于是第 n 项系数等于 U 中与 n 同奇偶的项组成的分式的第 n//2 项系数，n 每步减半。
+    共 O(log target) 步，每步一次 O(d^2) 的多项式乘法，d 为面额之和；不受面额最小公倍数大小的限制。
+
+    参数:
+    target: 找零金额
+    coins: 面额列表
+    modulus: 取模，None 表示精确计数
+    """
+    if target < 0:
+        return 0
+    coins = sorted(set(coins))
+    if not coins or coins[0] <= 0:
+        raise ValueError("coins must be a non-empty list of positive integers")
+
+    denominator = [1]
+    for coin in coins:
+        factor = [0] * (coin + 1)
+        factor[0], factor[coin] = 1, -1
+        denominator = _multiply(denominator, factor, modulus)
+    numerator = [1]
+
+    n = target
+    while n > 0:
+        negated = [-v if i % 2 else v for i, v in enumerate(denominator)]  # Q(-x)
+        numerator = _multiply(numerator, negated, modulus)[n % 2::2]
+        denominator = _multiply(denominator, negated, modulus)[::2]
+        n //= 2
+    ways = numerator[0] if numerator else 0  # 分母常数项始终为 1
+    return ways % modulus if modulus else ways
+
+
+def iter_change_combinations(total, coins=(5, 3, 2)):
+    """
+    逐个生成找零方式（惰性生成器，不递归、不预先保存所有组合）
+
+    每个组合是与 coins 顺序对应的硬币数量元组，例如 total=10、coins=(5, 3, 2) 时依次生成：
+    (0, 0, 5)、(0, 2, 2)、(1, 1, 1)、(2, 0, 0)
+
+    做法类似里程表：前 len(coins)-1 种面额的数量从最后一位开始逐个加一，
+    剩余金额不够时该位清零并向前进位；最后一种面额只在能整除剩余金额时补齐。
+    """
+    coins = tuple(coins)
+    if total < 0:
+        return
+    if not coins:
+        if total == 0:
+            yield ()
+        return
+    if min(coins) <= 0:
+        raise ValueError("coins must be positive integers")
+
+    last = coins[-1]
+    counts = [0] * len(coins)
+    rest = total  # 前 len(coins)-1 种面额用完后剩余的金额
+    while True:
+        if rest % last == 0:
+            counts[-1] = rest // last
+            yield tuple(counts)
+            counts[-1] = 0
+
+        i = len(coins) - 2
+        while i >= 0:
+            if rest >= coins[i]:
+                counts[i] += 1
+                rest -= coins[i]
+                break
+            rest += counts[i] * coins[i]
+            counts[i] = 0
+            i -= 1
+        if i < 0:
+            return
+
 def count_ways_to_make_change(target, coins):
     """
     创建一个数组来存储每种金额的找零方式数量
@@ -67,10 +260,112 @@ def count_ways_to_make_change(target, coins):
     return dp[target]
 
 
+class ChangeCounter:
+    """
+    同一组面额的多次找零计数
+
+    维护一张 dp 表，dp[a] 表示用全部面额找零金额 a 的方式数量。
+    查询更大的金额时只从已计算的位置继续向后扩展，已计算过的金额直接查表，O(1)。
+
+    设面额从小到大为 c1 < c2 < ... < ck，f_j(a) 表示只用前 j 种面额的方式数量：
+        f_j(a) = f_{j-1}(a) + f_j(a - c_j)
+    按金额从小到大推进时，f_j 只需要最近 c_j 个值，所以前 k-1 种面额各保存一个长度为 c_j 的环形缓冲区，
+    只有最后一层 f_k 保存完整的表（array('q')，每项 8 字节）。
+    超过 64 位整数范围时自动改用 Python 列表保存大整数；也可以指定 modulus 只计算对素数取模的结果。
+
+    参数:
+    coins: 面额列表（正整数，顺序和重复无关）
+    modulus: 取模的素数，None 表示精确计数
+    """
+
+    _shared = {}
+
+    def __init__(self, coins, modulus=None):
+        coins = sorted(set(coins))
+        if not coins or coins[0] <= 0:
+            raise ValueError("coins must be a non-empty list of positive integers")
+        if modulus is not None and not 1 < modulus < 1 << 62:
+            raise ValueError("modulus must be in (1, 2**62)")
+        self.coins = tuple(coins)
+        self.modulus = modulus
+        self._table = array("q", [1 % modulus if modulus else 1])
+        # 环形缓冲区，下标 a % c 处存放 f_j(a)；初始只有 f_j(0) = 1
+        self._windows = [[1] + [0] * (c - 1) for c in coins[:-1]]
+
+    @classmethod
+    def shared(cls, coins, modulus=None):
+        """按面额组合（及模数）复用同一个实例，让不同调用方共享 dp 表"""
+        key = (tuple(sorted(set(coins))), modulus)
+        counter = cls._shared.get(key)
+        if counter is None:
+            counter = cls._shared[key] = cls(key[0], modulus)
+        return counter
+
+    @property
+    def limit(self):
+        """已计算到的最大金额"""
+        return len(self._table) - 1
+
+    def _extend(self, target):
+        """把 dp 表扩展到 target"""
+        table = self._table
+        windows = self._windows
+        coins = self.coins
+        last = coins[-1]
+        modulus = self.modulus
+        for amount in range(len(table), target + 1):
+            ways = 0  # f_0(amount)，amount > 0 时不用任何硬币无法凑出
+            for window, coin in zip(windows, coins):
+                i = amount % coin
+                ways += window[i]  # window[i] 此时仍是 f_j(amount - coin)
+                if modulus:
+                    ways %= modulus
+                window[i] = ways
+            if amount >= last:
+                ways += table[amount - last]
+                if modulus:
+                    ways %= modulus
+            try:
+                table.append(ways)
+            except OverflowError:
+                # 超出 64 位，改用 Python 列表保存大整数
+                table = self._table = list(table)
+                table.append(ways)
+
+    def count(self, target):
+        """
+        找零金额 target 的方式数量（取模时为对 modulus 取模的结果）
+        """
+        if target < 0:
+            return 0
+        if target >= len(self._table):
+            self._extend(target)
+        return self._table[target]
+
+    def count_many(self, targets):
+        """
+        批量查询，只扩展一次到最大的金额
+        返回与 targets 顺序一致的列表
+        """
+        targets = list(targets)
+        if targets:
+            self.count(max(targets))
+        table = self._table
+        return [table[t] if t >= 0 else 0 for t in targets]
+
 
 
 if __name__ == '__main__':
+    print(change_money_recursive(99, 5))
     print(change_money(99, 5))
+    print(f"找零 10 元的所有方式（5元, 3元, 2元的数量）: {list(iter_change_combinations(10))}")
+    print(f"找零 1000000 元的方式数量: {change_money(1_000_000)}")
+    print(f"缓存统计: {change_money.cache_info()}")
+
+    formula = ChangeFormula([2, 3, 5])
+    formula.verify()
+    print(f"[公式]找零 10^12 元的方式数量: {formula.count(10 ** 12)}")
+    print(f"[Bostan–Mori]找零 10^12 元的方式数量: {count_change_bostan_mori(10 ** 12, [2, 3, 5])}")
 
     # 定义目标金额和面额
     target_amount = 99
@@ -78,3 +373,9 @@ if __name__ == '__main__':
     # 计算找零方式数量
     ways = count_ways_to_make_change(target_amount, coins)
     print(f"找零 {target_amount} 元的方式数量是: {ways}")
+
+    # 同一组面额的多次查询共享一张 dp 表
+    counter = ChangeCounter.shared(coins)
+    print(f"[ChangeCounter]找零 10/99/1000 元的方式数量: {counter.count_many([10, 99, 1000])}")
+    big = ChangeCounter([1, 2, 5, 10, 20, 50, 100], modulus=1_000_000_007)
+    print(f"[ChangeCounter]用人民币面额找零 100000 元的方式数量 mod 1e9+7: {big.count(100000)}")
@@ -1,3 +1,5 @@
+from array import array
+
 
 def climb_stairs(n):
     """
@@ -36,8 +38,207 @@ def climb_stairs_recursive(n):
     return climb_stairs_recursive(n - 1) + climb_stairs_recursive(n - 2)
 
 
+def climb_stairs_fast(n, modulus=None):
+    """
+    快速倍增解法，O(log n) 时间、O(1) 内存
+
+    方法数满足斐波那契递推，climb_stairs(n) = F(n+1)（F(1)=F(2)=1）。
+    利用恒等式
+        F(2k)   = F(k) * (2F(k+1) - F(k))
+        F(2k+1) = F(k)^2 + F(k+1)^2
+    从 n+1 的最高二进制位开始，每一位把 k 翻倍（位为 1 时再加一）。
+
+    参数:
+    n: 台阶数
+    modulus: 取模，None 时返回精确的大整数
+    """
+    if n < 0:
+        return 0
+    a, b = 0, 1  # F(k), F(k+1)，k 从 0 开始
+    for bit in bin(n + 1)[2:]:
+        c = a * (2 * b - a)  # F(2k)
+        d = a * a + b * b  # F(2k+1)
+        if bit == "1":
+            a, b = d, c + d
+        else:
+            a, b = c, d
+        if modulus:
+            a, b = a % modulus, b % modulus
+    return a
+
+
+def _multiply_mod(a, b, weights, modulus):
+    """多项式相乘后对特征多项式 x^d - Σ w_j x^(d-j) 取余"""
+    d = len(weights)
+    product = [0] * (2 * d - 1)
+    for i, x in enumerate(a):
+        if x:
+            for j, y in enumerate(b):
+                product[i + j] += x * y
+    # 从高次项开始用 x^k = Σ w_j x^(k-j) 降次
+    for k in range(len(product) - 1, d - 1, -1):
+        c = product[k]
+        if c:
+            for j, w in enumerate(weights, 1):
+                if w:
+                    product[k - j] += c * w
+    result = product[:d]
+    if modulus:
+        result = [v % modulus for v in result]
+    return result
+
+
+def _shift_mod(a, weights, modulus):
+    """多项式乘以 x 后对特征多项式取余"""
+    d = len(weights)
+    top = a[-1]  # 乘以 x 后成为 x^d 的系数
+    result = [0] + a[:-1]
+    if top:
+        for j, w in enumerate(weights, 1):
+            if w:
+                result[d - j] += top * w
+    if modulus:
+        result = [v % modulus for v in result]
+    return result
+
+
+def climb_stairs_steps(n, steps=(1, 2), modulus=None):
+    """
+    任意步长集合的爬楼梯方法数（Kitamasa 法），O(d^2 log n) 时间，d 为最大步长
+
+    设 a(n) 为爬 n 级台阶的方法数，a(0)=1，则 a(n) = Σ a(n-s)（s 属于 steps）。
+    把 x^n 对递推的特征多项式取余得到 x^n ≡ Σ r_i x^i（i < d），
+    则 a(n) = Σ r_i · a(i)，前 d 项直接用 dp 求出。
+    例如 steps=(1, 3, 5) 时，每次可以爬 1、3 或 5 级。
+
+    参数:
+    n: 台阶数
+    steps: 每次可以爬的台阶数
+    modulus: 取模，None 时返回精确的大整数
+    """
+    if n < 0:
+        return 0
+    steps = sorted(set(steps))
+    if not steps or steps[0] <= 0:
+        raise ValueError("steps must be a non-empty list of positive integers")
+    d = steps[-1]
+    weights = [1 if j in steps else 0 for j in range(1, d + 1)]  # a(n) = Σ w_j a(n-j)
+
+    # 前 d 项
+    initial = [1] + [0] * (d - 1)
+    for i in range(1, d):
+        initial[i] = sum(initial[i - s] for s in steps if s <= i)
+    if n < d:
+        return initial[n] % modulus if modulus else initial[n]
+
+    # 二进制快速幂求 x^n mod 特征多项式
+    result = [1] + [0] * (d - 1)
+    for bit in bin(n)[2:]:
+        result = _multiply_mod(result, result, weights, modulus)
+        if bit == "1":
+            result = _shift_mod(result, weights, modulus)
+    ways = sum(r * v for r, v in zip(result, initial))
+    return ways % modulus if modulus else ways
+
+
+class StairCounter:
+    """
+    多次查询爬楼梯方法数时共享的预计算表
+
+    表按台阶数从小到大增长，查询超出已计算范围时只从末尾继续扩展，已计算过的直接查表。
+    表保存在 array('q') 中；精确计数超过 64 位时自动改用 Python 列表。
+    指定 modulus 时可以再指定 max_entries 限制内存：表超过上限后丢弃较早的一半，
+    只保留继续递推所需的最近部分；查询已丢弃的台阶数时改用 climb_stairs_steps 直接计算。
+
+    参数:
+    steps: 每次可以爬的台阶数
+    modulus: 取模，None 表示精确计数
+    max_entries: 表的最大长度，只能和 modulus 一起使用
+    """
+
+    def __init__(self, steps=(1, 2), modulus=None, max_entries=None):
+        steps = sorted(set(steps))
+        if not steps or steps[0] <= 0:
+            raise ValueError("steps must be a non-empty list of positive integers")
+        if max_entries is not None:
+            if modulus is None:
+                raise ValueError("max_entries requires modulus (exact counts cannot be bounded)")
+            if max_entries < 2 * steps[-1]:
+                raise ValueError("max_entries must be at least twice the largest step")
+        self.steps = tuple(steps)
+        self.modulus = modulus
+        self.max_entries = max_entries
+        self._table = array("q", [1 % modulus if modulus else 1])  # a(0) = 1
+        self._offset = 0  # _table[0] 对应的台阶数
+
+    @property
+    def limit(self):
+        """已计算到的最大台阶数"""
+        return self._offset + len(self._table) - 1
+
+    def _extend(self, n):
+        table = self._table
+        offset = self._offset
+        steps = self.steps
+        modulus = self.modulus
+        for i in range(offset + len(table), n + 1):
+            ways = 0
+            for step in steps:
+                if step > i:
+                    break
+                ways += table[i - step - offset]
+            if modulus:
+                ways %= modulus
+            try:
+                table.append(ways)
+            except OverflowError:
+                # 超出 64 位，改用 Python 列表保存大整数
+                table = self._table = list(table)
+                table.append(ways)
+            if self.max_entries is not None and len(table) > self.max_entries:
+                drop = len(table) - self.max_entries // 2
+                del table[:drop]
+                offset = self._offset = offset + drop
+
+    def count(self, n):
+        """爬 n 级台阶的方法数（取模时为对 modulus 取模的结果）"""
+        if n < 0:
+            return 0
+        if n < self._offset:
+            return climb_stairs_steps(n, self.steps, self.modulus)
+        if n > self.limit:
+            self._extend(n)
+        return self._table[n - self._offset]
+
+    def count_many(self, ns):
+        """
+        批量查询：按台阶数从小到大依次扩展并取值，表只填充一遍到 max(ns)；
+        有内存上限时也不会因为先算大的再算小的而重复计算
+        返回与 ns 顺序一致的列表
+        """
+        ns = list(ns)
+        answers = {}
+        for n in sorted(set(ns)):
+            answers[n] = self.count(n)
+        return [answers[n] for n in ns]
+
+    def stream(self, ns):
+        """对可迭代的台阶数逐个生成结果（惰性，适合查询流）"""
+        for n in ns:
+            yield self.count(n)
+
+
 
 if __name__ == "__main__":
     n = 10
     print(f"[动态规划]爬 {n} 级台阶的方法数是: {climb_stairs(n)}")
     print(f"[递归]爬 {n} 级台阶的方法数是: {climb_stairs_recursive(n)}")
+    print(f"[快速倍增]爬 {n} 级台阶的方法数是: {climb_stairs_fast(n)}")
+    print(f"[快速倍增]爬 10^18 级台阶的方法数 mod 1e9+7: {climb_stairs_fast(10 ** 18, 1_000_000_007)}")
+    print(f"[Kitamasa]每次爬 1/3/5 级，爬 10^18 级台阶的方法数 mod 1e9+7: "
+          f"{climb_stairs_steps(10 ** 18, (1, 3, 5), 1_000_000_007)}")
+
+    counter = StairCounter()
+    print(f"[StairCounter]爬 100/5/10 级台阶的方法数: {counter.count_many([100, 5, 10])}")
+    bounded = StairCounter(modulus=1_000_000_007, max_entries=1024)
+    print(f"[StairCounter]查询流 mod 1e9+7: {list(bounded.stream(range(99_990, 100_000, 3)))}")
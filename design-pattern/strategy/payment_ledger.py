@@ -0,0 +1,431 @@
+"""
+支付流水账本
+
+只追加的列式二进制账本，用于对账：PaymentProcessor 处理完每笔支付后把 (请求, 结果) 交给账本，
+账本只做一次 deque.append，由后台线程按批编码、写入并 fsync，不增加支付路径的延迟。
+
+文件格式（字节序见文件头）:
+    文件头  MAGIC(8) + 字节序(1) + 填充(7)
+    数据块  块头 <4sIII: b"PLBK", 行数 n, 新增字典项数 k, 块体字节数
+            块体由以下各段依次组成，每段按 8 字节对齐:
+            时间戳 float64[n] | 金额 float64[n] | 手续费 float64[n] | 处理耗时 float32[n]
+            | 参考号偏移 uint32[n+1] | 交易号偏移 uint32[n+1]
+            | 货币 uint16[n] | 策略 uint16[n] | 成功标志 uint8[n]
+            | 新增字典项偏移 uint32[k+1] | 新增字典项 UTF-8 | 参考号 UTF-8 | 交易号 UTF-8
+货币与策略名称共用一个字典，按出现顺序编号，每个块只写入本块新增的字典项。
+手续费、处理耗时为空时记为 NaN，交易号为空时记为空串。
+最后一个块写到一半进程崩溃时，读取会忽略它，重新打开写入时会截掉它。
+"""
+import collections
+import math
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+from array import array
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from strategy_payment import PaymentRequest, PaymentResult
+
+MAGIC = b"PAYLEDG1"
+FILE_HEADER = struct.Struct("<8sc7x")
+BLOCK_MAGIC = b"PLBK"
+BLOCK_HEADER = struct.Struct("<4sIII")
+MAX_DICTIONARY = 1 << 16  # 字典编号为 uint16
+
+
+def _pad(n: int) -> int:
+    return -n % 8
+
+
+@dataclass
+class LedgerEntry:
+    """账本中的一条记录"""
+    timestamp: float
+    strategy: str
+    currency: str
+    amount: float
+    reference: str
+    success: bool
+    transaction_id: Optional[str]
+    fee: Optional[float]
+    processing_time: Optional[float]
+
+
+class _Block:
+    """一个数据块的列视图（numeric 列为指向 mmap 的 memoryview，不复制）"""
+
+    def __init__(self, rows: int, columns: Dict[str, memoryview], references: memoryview,
+                 transactions: memoryview):
+        self.rows = rows
+        self.columns = columns
+        self._references = references
+        self._transactions = transactions
+
+    def reference(self, i: int) -> str:
+        offsets = self.columns["reference_offsets"]
+        return bytes(self._references[offsets[i]:offsets[i + 1]]).decode("utf-8")
+
+    def transaction_id(self, i: int) -> Optional[str]:
+        offsets = self.columns["transaction_offsets"]
+        return bytes(self._transactions[offsets[i]:offsets[i + 1]]).decode("utf-8") or None
+
+
+# (列名, array 类型码, 每行个数的附加值)；顺序即块内布局顺序
+_COLUMNS = [
+    ("timestamp", "d", 0),
+    ("amount", "d", 0),
+    ("fee", "d", 0),
+    ("processing_time", "f", 0),
+    ("reference_offsets", "I", 1),
+    ("transaction_offsets", "I", 1),
+    ("currency", "H", 0),
+    ("strategy", "H", 0),
+    ("success", "B", 0),
+]
+
+
+def _parse_block(buffer: memoryview, pos: int, byteswap: bool):
+    """
+    解析 pos 处的数据块
+    :return: (块, 本块新增的字典项, 下一个块的位置)；块不完整时返回 None
+    """
+    if pos + BLOCK_HEADER.size > len(buffer):
+        return None
+    magic, rows, new_entries, body_size = BLOCK_HEADER.unpack_from(buffer, pos)
+    if magic != BLOCK_MAGIC:
+        raise ValueError(f"Corrupted ledger block at offset {pos}")
+    pos += BLOCK_HEADER.size
+    end = pos + body_size
+    if end > len(buffer):
+        return None
+
+    columns = {}
+    for name, typecode, extra in _COLUMNS:
+        size = array(typecode).itemsize * (rows + extra)
+        raw = buffer[pos:pos + size]
+        if byteswap and typecode != "B":
+            column = array(typecode)
+            column.frombytes(raw)
+            column.byteswap()
+            columns[name] = memoryview(column)
+        else:
+            columns[name] = raw.cast(typecode)
+        pos += size + _pad(size)
+
+    size = 4 * (new_entries + 1)
+    dictionary_offsets = array("I")
+    dictionary_offsets.frombytes(buffer[pos:pos + size])
+    if byteswap:
+        dictionary_offsets.byteswap()
+    pos += size + _pad(size)
+    blob = buffer[pos:pos + dictionary_offsets[-1]]
+    entries = [bytes(blob[dictionary_offsets[i]:dictionary_offsets[i + 1]]).decode("utf-8")
+               for i in range(new_entries)]
+    pos += dictionary_offsets[-1]
+
+    references = buffer[pos:pos + columns["reference_offsets"][rows]]
+    pos += columns["reference_offsets"][rows]
+    transactions = buffer[pos:pos + columns["transaction_offsets"][rows]]
+    return _Block(rows, columns, references, transactions), entries, end
+
+
+class LedgerReader:
+    """
+    基于 mmap 的账本读取器
+    :param path: 账本文件路径
+    """
+
+    def __init__(self, path: str):
+        self._file = open(path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+        self._buffer = memoryview(self._mmap) if self._mmap is not None else memoryview(b"")
+        if len(self._buffer) < FILE_HEADER.size:
+            raise ValueError(f"{path} is not a payment ledger")
+        magic, byteorder = FILE_HEADER.unpack_from(self._buffer)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a payment ledger")
+        self._byteswap = (byteorder == b"<") != (sys.byteorder == "little")
+        self.dictionary: List[str] = []
+        self.valid_length = FILE_HEADER.size  # 最后一个完整块的结束位置
+
+    def blocks(self) -> Iterator[_Block]:
+        """依次返回每个完整的数据块，同时构建字典"""
+        self.dictionary.clear()
+        pos = FILE_HEADER.size
+        while True:
+            parsed = _parse_block(self._buffer, pos, self._byteswap)
+            if parsed is None:
+                break
+            block, entries, pos = parsed
+            self.dictionary.extend(entries)
+            self.valid_length = pos
+            yield block
+
+    def scan(self) -> Iterator[LedgerEntry]:
+        """逐条读取记录"""
+        dictionary = self.dictionary
+        for block in self.blocks():
+            c = block.columns
+            for i in range(block.rows):
+                fee, processing_time = c["fee"][i], c["processing_time"][i]
+                yield LedgerEntry(
+                    timestamp=c["timestamp"][i],
+                    strategy=dictionary[c["strategy"][i]],
+                    currency=dictionary[c["currency"][i]],
+                    amount=c["amount"][i],
+                    reference=block.reference(i),
+                    success=bool(c["success"][i]),
+                    transaction_id=block.transaction_id(i),
+                    fee=None if math.isnan(fee) else fee,
+                    processing_time=None if math.isnan(processing_time) else processing_time,
+                )
+
+    def fees_by_provider_day(self) -> Dict[Tuple[str, str], float]:
+        """按 (策略名称, UTC 日期) 汇总成功支付的手续费，只读取需要的列"""
+        totals: Dict[Tuple[int, int], float] = collections.defaultdict(float)
+        for block in self.blocks():
+            c = block.columns
+            for strategy, timestamp, fee, success in zip(c["strategy"], c["timestamp"], c["fee"], c["success"]):
+                if success and fee == fee:  # fee == fee 排除 NaN
+                    totals[(strategy, int(timestamp // 86400))] += fee
+        dictionary = self.dictionary
+        return {(dictionary[strategy], datetime.fromtimestamp(day * 86400, timezone.utc).date().isoformat()): fee
+                for (strategy, day), fee in sorted(totals.items())}
+
+    def totals_by_strategy(self) -> Dict[str, Dict[str, float]]:
+        """按策略汇总笔数、成功笔数、金额与手续费"""
+        totals = collections.defaultdict(lambda: {"count": 0, "success": 0, "amount": 0.0, "fees": 0.0})
+        for block in self.blocks():
+            c = block.columns
+            for strategy, amount, fee, success in zip(c["strategy"], c["amount"], c["fee"], c["success"]):
+                t = totals[strategy]
+                t["count"] += 1
+                if success:
+                    t["success"] += 1
+                    t["amount"] += amount
+                    if fee == fee:
+                        t["fees"] += fee
+        return {self.dictionary[k]: v for k, v in totals.items()}
+
+    def close(self):
+        self._buffer.release()
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                pass  # 调用方仍持有块的列视图，映射在视图释放后由垃圾回收关闭
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class PaymentLedger:
+    """
+    只追加的支付账本（写入端）
+    record() 只把记录放进队列；后台线程攒满 batch_size 条或每隔 flush_interval 秒写一个块并 fsync。
+    可通过 PaymentProcessor.enable_ledger 接入。
+    :param path: 账本文件路径，已存在时继续追加
+    :param batch_size: 每个块的最大行数
+    :param flush_interval: 最长刷盘间隔（秒）
+    :param fsync: 是否在每个块写入后 fsync
+    :param max_pending: 写入失败后队列中最多保留的记录数，超出时 record() 抛出写入错误
+    """
+
+    def __init__(self, path: str, batch_size: int = 4096, flush_interval: float = 1.0, fsync: bool = True,
+                 max_pending: int = 1 << 20):
+        self._path = path
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._fsync = fsync
+        self._max_pending = max_pending
+        self._pending = collections.deque()
+        self._dictionary: Dict[str, int] = {}
+        self._error: Optional[BaseException] = None  # 最近一次写入失败的错误，写入成功后清除
+        self._open()
+
+        self._wakeup = threading.Event()
+        self._closed = False
+        self._io_lock = threading.Lock()
+        self._writer = threading.Thread(target=self._run, name="payment-ledger", daemon=True)
+        self._writer.start()
+
+    def _open(self):
+        """打开文件；已有账本时恢复字典并截掉不完整的尾块"""
+        if os.path.exists(self._path) and os.path.getsize(self._path) > 0:
+            with LedgerReader(self._path) as reader:
+                for _ in reader.blocks():
+                    pass
+                self._dictionary = {name: i for i, name in enumerate(reader.dictionary)}
+                valid_length = reader.valid_length
+                if reader._byteswap:
+                    raise ValueError("Cannot append to a ledger written with a different byte order")
+            self._file = open(self._path, "r+b")
+            self._file.truncate(valid_length)
+            self._file.seek(valid_length)
+        else:
+            self._file = open(self._path, "wb")
+            self._file.write(FILE_HEADER.pack(MAGIC, b"<" if sys.byteorder == "little" else b">"))
+            self._file.flush()
+
+    def record(self, strategy_name: str, request: PaymentRequest, result: PaymentResult):
+        """
+        记录一笔支付（只入队，不做 I/O）
+        后台写入失败且队列已积压到 max_pending 条时抛出该写入错误，记录不入队
+        """
+        error = self._error
+        if error is not None and len(self._pending) >= self._max_pending:
+            raise error
+        self._pending.append((time.time(), strategy_name, request, result))
+        if len(self._pending) >= self._batch_size:
+            self._wakeup.set()
+
+    @property
+    def error(self) -> Optional[BaseException]:
+        """最近一次写入失败的错误；之后写入成功时为 None"""
+        return self._error
+
+    def _run(self):
+        while not self._closed:
+            self._wakeup.wait(self._flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                pass  # 错误已保存在 self._error，记录留在队列中，下次刷盘重试
+
+    def flush(self):
+        """
+        把队列中的记录写成若干个块
+        写入或 fsync 失败时截掉本次写入的内容、把记录放回队列并抛出错误；
+        新的字典项只在数据落盘后才生效，因此已写入的块不会引用不存在的字典项
+        """
+        with self._io_lock:
+            if not self._pending:
+                return
+            start = self._file.tell()
+            dictionary = dict(self._dictionary)
+            written = []
+            try:
+                while self._pending:
+                    batch = []
+                    while self._pending and len(batch) < self._batch_size:
+                        batch.append(self._pending.popleft())
+                    written.append(batch)
+                    self._file.write(self._encode(batch, dictionary))
+                self._file.flush()
+                if self._fsync:
+                    os.fsync(self._file.fileno())
+            except Exception as e:
+                for batch in reversed(written):
+                    self._pending.extendleft(reversed(batch))
+                self._error = e
+                self._rollback(start)
+                raise
+            self._dictionary = dictionary
+            self._error = None
+
+    def _rollback(self, position: int):
+        """丢弃 position 之后写入（或仍在缓冲区中）的内容"""
+        try:
+            self._file.seek(position)
+            self._file.truncate(position)
+        except OSError:
+            # 缓冲区中仍有无法写出的数据，重新打开文件丢弃它
+            self._file = self._reopen(position)
+
+    def _reopen(self, position: int):
+        try:
+            self._file.close()
+        except OSError:
+            pass
+        f = open(self._path, "r+b")
+        f.truncate(position)
+        f.seek(position)
+        return f
+
+    @staticmethod
+    def _intern(name: str, dictionary: Dict[str, int], new_entries: List[str]) -> int:
+        index = dictionary.get(name)
+        if index is None:
+            if len(dictionary) >= MAX_DICTIONARY:
+                raise ValueError("Ledger dictionary is full")
+            index = dictionary[name] = len(dictionary)
+            new_entries.append(name)
+        return index
+
+    def _encode(self, batch, dictionary: Dict[str, int]) -> bytes:
+        """把一批记录编码为数据块，新字典项加入 dictionary（副本）"""
+        new_entries: List[str] = []
+        columns = {name: array(typecode) for name, typecode, _ in _COLUMNS}
+        references, transactions = bytearray(), bytearray()
+        columns["reference_offsets"].append(0)
+        columns["transaction_offsets"].append(0)
+        for timestamp, strategy_name, request, result in batch:
+            columns["timestamp"].append(timestamp)
+            columns["amount"].append(request.amount)
+            columns["fee"].append(math.nan if result.fee is None else result.fee)
+            columns["processing_time"].append(math.nan if result.processing_time is None
+                                              else result.processing_time)
+            references += request.reference.encode("utf-8")
+            columns["reference_offsets"].append(len(references))
+            transactions += (result.transaction_id or "").encode("utf-8")
+            columns["transaction_offsets"].append(len(transactions))
+            columns["currency"].append(self._intern(request.currency, dictionary, new_entries))
+            columns["strategy"].append(self._intern(strategy_name, dictionary, new_entries))
+            columns["success"].append(1 if result.success else 0)
+
+        body = bytearray()
+        for name, _, _ in _COLUMNS:
+            raw = columns[name].tobytes()
+            body += raw + bytes(_pad(len(raw)))
+        encoded = [e.encode("utf-8") for e in new_entries]
+        offsets = array("I", [0])
+        for e in encoded:
+            offsets.append(offsets[-1] + len(e))
+        raw = offsets.tobytes()
+        body += raw + bytes(_pad(len(raw)))
+        body += b"".join(encoded) + references + transactions
+        return BLOCK_HEADER.pack(BLOCK_MAGIC, len(batch), len(new_entries), len(body)) + bytes(body)
+
+    def close(self):
+        """写出剩余记录并关闭文件；仍无法写出时抛出写入错误（文件照常关闭）"""
+        self._closed = True
+        self._wakeup.set()
+        self._writer.join()
+        try:
+            self.flush()
+        finally:
+            self._file.close()
+
+
+if __name__ == "__main__":
+    import tempfile
+    from strategy_payment import PaymentProcessor, PaymentType
+
+    path = os.path.join(tempfile.mkdtemp(), "payments.ledger")
+    processor = PaymentProcessor()
+    ledger = PaymentLedger(path, flush_interval=0.1)
+    processor.enable_ledger(ledger)
+    for i in range(3):
+        request = PaymentRequest(amount=100.0 + i, currency="CNY", reference=f"LEDGER-{i}")
+        processor.process_payment(PaymentType.BANK_TRANSFER, request)
+    batch = [(PaymentType.BANK_TRANSFER, PaymentRequest(amount=10.0, currency="USD", reference=f"BATCH-{i}"))
+             for i in range(5)]
+    processor.process_batch(batch)
+    ledger.close()
+
+    print(f"\n账本文件 {path}（{os.path.getsize(path)} 字节）:")
+    with LedgerReader(path) as reader:
+        for entry in reader.scan():
+            print(f"- {entry.reference} {entry.strategy} {entry.amount} {entry.currency} fee={entry.fee}")
+        print("按渠道和日期汇总手续费:", reader.fees_by_provider_day())
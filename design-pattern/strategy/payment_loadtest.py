@@ -0,0 +1,389 @@
+"""
+支付处理压测工具
+
+用本地模拟支付渠道（可配置延迟分布与失败率）替换 time.sleep 桩，
+以同步、线程池、异步三种方式驱动 PaymentProcessor / AsyncPaymentProcessor，
+按给定请求速率和支付类型比例发送请求，报告 p50/p99/p999 延迟与最大可持续吞吐量。
+
+请求按固定速率（开环）发出，延迟从计划发送时间算起，
+避免系统变慢时发送端跟着变慢而低估延迟（coordinated omission）。
+
+用法:
+    python payment_loadtest.py --mode async --rate 2000 --duration 5
+    python payment_loadtest.py --mode threaded --find-max --slo-p99 50
+    python payment_loadtest.py --mix paypal=3 credit_card=1 --latency lognormal:20:0.5 --failure-rate 0.01
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from strategy_payment import (AsyncPaymentProcessor, IPaymentStrategy, PaymentProcessor, PaymentRequest,
+                              PaymentResult, PaymentStrategyFactory, PaymentType)
+
+
+# ==================== 模拟支付渠道 ====================
+
+LatencySampler = Callable[[random.Random], float]  # 返回一次调用的延迟（毫秒）
+
+
+def constant_latency(ms: float) -> LatencySampler:
+    return lambda rng: ms
+
+
+def exponential_latency(mean_ms: float) -> LatencySampler:
+    return lambda rng: rng.expovariate(1.0 / mean_ms)
+
+
+def lognormal_latency(median_ms: float, sigma: float = 0.5) -> LatencySampler:
+    """长尾延迟：中位数为 median_ms"""
+    mu = math.log(median_ms)
+    return lambda rng: rng.lognormvariate(mu, sigma)
+
+
+LATENCY_DISTRIBUTIONS: Dict[str, Callable[..., LatencySampler]] = {
+    "constant": constant_latency,
+    "exponential": exponential_latency,
+    "lognormal": lognormal_latency,
+}
+
+
+def parse_latency(spec: str) -> LatencySampler:
+    """解析 "名称:参数1:参数2"，如 "lognormal:20:0.5" """
+    name, *params = spec.split(":")
+    if name not in LATENCY_DISTRIBUTIONS:
+        raise ValueError(f"Unknown latency distribution: {name}")
+    return LATENCY_DISTRIBUTIONS[name](*map(float, params))
+
+
+class MockProvider:
+    """
+    本地模拟支付渠道
+    :param latency: 延迟分布
+    :param failure_rate: 失败概率
+    :param seed: 随机种子
+    """
+
+    def __init__(self, latency: LatencySampler = None, failure_rate: float = 0.0, seed: int = None):
+        self._latency = latency or constant_latency(10)
+        self._failure_rate = failure_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()  # random.Random 的多步调用不是线程安全的
+
+    def sample(self) -> Tuple[float, bool]:
+        """返回 (延迟秒数, 是否成功)"""
+        with self._lock:
+            latency_ms = self._latency(self._rng)
+            success = self._rng.random() >= self._failure_rate
+        return latency_ms / 1000, success
+
+
+class MockPaymentStrategy(IPaymentStrategy):
+    """调用 MockProvider 的支付策略，同时提供同步与原生异步实现"""
+
+    def __init__(self, name: str, provider: MockProvider, fee_rate: float = 0.01):
+        self._name = name
+        self._provider = provider
+        self._fee_rate = fee_rate
+
+    @property
+    def strategy_name(self) -> str:
+        return self._name
+
+    def process_payment(self, request: PaymentRequest) -> PaymentResult:
+        delay, success = self._provider.sample()
+        time.sleep(delay)
+        return self._result(request, success, delay)
+
+    async def process_payment_async(self, request: PaymentRequest) -> PaymentResult:
+        delay, success = self._provider.sample()
+        await asyncio.sleep(delay)
+        return self._result(request, success, delay)
+
+    def _result(self, request: PaymentRequest, success: bool, delay: float) -> PaymentResult:
+        return PaymentResult(
+            success=success,
+            message="Mock payment processed" if success else "Mock provider declined",
+            transaction_id=f"MOCK-{request.reference}" if success else None,
+            fee=request.amount * self._fee_rate if success else None,
+            processing_time=delay * 1000,
+        )
+
+
+def install_mock_providers(mix: Dict[PaymentType, float], latency: LatencySampler = None,
+                           failure_rate: float = 0.0, seed: int = 42) -> PaymentStrategyFactory:
+    """为 mix 中的每种支付类型注册一个 MockPaymentStrategy（会替换工厂中已注册的策略）"""
+    factory = PaymentStrategyFactory()
+    for i, payment_type in enumerate(mix):
+        provider = MockProvider(latency, failure_rate, seed + i)
+        factory.register_strategy(payment_type, MockPaymentStrategy(f"Mock{payment_type.name}", provider))
+    return factory
+
+
+# ==================== 压测执行 ====================
+
+@dataclass
+class LoadTestResult:
+    """一次压测的结果"""
+    mode: str
+    target_rate: float  # 目标请求速率（笔/秒）
+    send_rate: float  # 实际发送速率（笔/秒）
+    achieved_rate: float  # 发送期间的完成速率（笔/秒），不含发送结束后等待在途请求的时间
+    requests: int
+    failures: int
+    p50_ms: float
+    p99_ms: float
+    p999_ms: float
+    max_ms: float
+
+    @property
+    def error_rate(self) -> float:
+        return self.failures / self.requests if self.requests else 0.0
+
+    def violation(self, slo_p99_ms: float, min_ratio: float = 0.95) -> Optional[str]:
+        """
+        检查是否可持续，返回不满足的条件，满足时返回 None
+        :param slo_p99_ms: p99 上限（毫秒）
+        :param min_ratio: 发送速率、完成速率相对目标速率的最低比例
+        """
+        if self.send_rate < self.target_rate * min_ratio:
+            return f"发送速率 {self.send_rate:.0f}/s 达不到目标 {self.target_rate:.0f}/s（压测端瓶颈）"
+        if self.achieved_rate < self.target_rate * min_ratio:
+            return f"完成速率 {self.achieved_rate:.0f}/s 低于目标 {self.target_rate:.0f}/s 的 {min_ratio:.0%}"
+        if self.p99_ms > slo_p99_ms:
+            return f"p99 {self.p99_ms:.2f}ms 超过 {slo_p99_ms}ms"
+        return None
+
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+def _summarize(mode: str, rate: float, latencies: List[float], failures: int, send_window: float,
+               completions: List[float] = None) -> LoadTestResult:
+    """
+    :param latencies: 每笔请求的延迟（毫秒）
+    :param send_window: 从开始到最后一笔请求发出的时间（秒）
+    :param completions: 每笔请求完成的时间（秒，相对开始时间）；为 None 时按 send_window 计算完成速率。
+        完成速率统计 [p50 延迟, p50 延迟 + send_window] 内完成的请求数：稳定时约等于发送速率，
+        过载时为系统的实际处理能力，且不受发送结束后等待在途请求（排空）时间的影响
+    """
+    latencies.sort()
+    p50_ms = _percentile(latencies, 0.50)
+    if send_window <= 0:
+        achieved_rate = 0.0
+    elif completions is None:
+        achieved_rate = len(latencies) / send_window
+    else:
+        offset = p50_ms / 1000
+        achieved_rate = sum(offset <= t <= offset + send_window for t in completions) / send_window
+    return LoadTestResult(
+        mode=mode,
+        target_rate=rate,
+        send_rate=len(latencies) / send_window if send_window > 0 else 0.0,
+        achieved_rate=achieved_rate,
+        requests=len(latencies),
+        failures=failures,
+        p50_ms=p50_ms,
+        p99_ms=_percentile(latencies, 0.99),
+        p999_ms=_percentile(latencies, 0.999),
+        max_ms=latencies[-1] if latencies else 0.0,
+    )
+
+
+class LoadGenerator:
+    """
+    支付压测器
+    :param mix: 支付类型到权重的映射
+    :param seed: 随机种子，保证各次运行的请求序列一致
+    """
+
+    def __init__(self, mix: Dict[PaymentType, float], seed: int = 42):
+        if not mix:
+            raise ValueError("Payment mix cannot be empty")
+        self._types = list(mix)
+        self._weights = [mix[t] for t in self._types]
+        self._seed = seed
+
+    def _payments(self, count: int):
+        rng = random.Random(self._seed)
+        types = rng.choices(self._types, self._weights, k=count)
+        return [(payment_type, PaymentRequest(amount=round(rng.uniform(1, 500), 2), currency="USD",
+                                              reference=f"LOAD-{i}"))
+                for i, payment_type in enumerate(types)]
+
+    def run(self, mode: str, rate: float, duration: float, workers: int = 64) -> LoadTestResult:
+        """
+        以固定速率发送 rate * duration 笔请求
+        :param mode: "sync" 单线程依次处理（速率不限，测单线程上限）、"threaded" 线程池、"async" 事件循环
+        :param rate: 目标速率（笔/秒），sync 模式忽略
+        :param duration: 持续时间（秒）
+        :param workers: threaded 模式的线程数
+        """
+        payments = self._payments(max(1, int(rate * duration)))
+        if mode == "sync":
+            return self._run_sync(payments, duration)
+        if mode == "threaded":
+            return self._run_threaded(payments, rate, workers)
+        if mode == "async":
+            return asyncio.run(self._run_async(payments, rate))
+        raise ValueError(f"Unknown mode: {mode}")
+
+    def _run_sync(self, payments, duration: float) -> LoadTestResult:
+        processor = PaymentProcessor()
+        latencies, failures = [], 0
+        start = time.perf_counter()
+        for payment_type, request in payments:
+            sent = time.perf_counter()
+            if sent - start >= duration:
+                break
+            result = processor.process_payment(payment_type, request)
+            latencies.append((time.perf_counter() - sent) * 1000)
+            failures += not result.success
+        elapsed = time.perf_counter() - start
+        return _summarize("sync", len(latencies) / elapsed, latencies, failures, elapsed)
+
+    def _run_threaded(self, payments, rate: float, workers: int) -> LoadTestResult:
+        processor = PaymentProcessor()
+        latencies, failures = [], 0
+        lock = threading.Lock()
+
+        completions = []
+
+        def call(payment_type, request, scheduled):
+            nonlocal failures
+            result = processor.process_payment(payment_type, request)
+            done = time.perf_counter()
+            with lock:
+                latencies.append((done - scheduled) * 1000)
+                completions.append(done - start)
+                failures += not result.success
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for i, (payment_type, request) in enumerate(payments):
+                scheduled = start + i / rate
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                executor.submit(call, payment_type, request, scheduled)
+            send_window = time.perf_counter() - start
+        return _summarize("threaded", rate, latencies, failures, send_window, completions)
+
+    async def _run_async(self, payments, rate: float) -> LoadTestResult:
+        processor = AsyncPaymentProcessor()
+        latencies, completions, failures = [], [], 0
+
+        async def call(payment_type, request, scheduled):
+            nonlocal failures
+            result = await processor.process_payment(payment_type, request)
+            done = time.perf_counter()
+            latencies.append((done - scheduled) * 1000)
+            completions.append(done - start)
+            failures += not result.success
+
+        tasks = []
+        start = time.perf_counter()
+        for i, (payment_type, request) in enumerate(payments):
+            scheduled = start + i / rate
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(call(payment_type, request, scheduled)))
+        send_window = time.perf_counter() - start
+        await asyncio.gather(*tasks)
+        processor.close()
+        return _summarize("async", rate, latencies, failures, send_window, completions)
+
+    def find_max_throughput(self, mode: str, start_rate: float = 100, slo_p99_ms: float = 100,
+                            duration: float = 2.0, growth: float = 1.5, max_rate: float = 100_000,
+                            **kwargs) -> Tuple[Optional[LoadTestResult], List[LoadTestResult]]:
+        """
+        逐步提高速率，找到满足 SLO 的最大可持续吞吐量
+        可持续：p99 不超过 slo_p99_ms，且发送速率、完成速率都不低于目标速率的 95%（见 LoadTestResult.violation）
+        :return: (最后一个满足条件的结果，为 None 表示起始速率已不满足; 所有步骤的结果)
+        """
+        best, steps = None, []
+        rate = start_rate
+        while rate <= max_rate:
+            result = self.run(mode, rate, duration, **kwargs)
+            steps.append(result)
+            if result.violation(slo_p99_ms) is not None:
+                break
+            best = result
+            rate *= growth
+        return best, steps
+
+
+# ==================== 报告 ====================
+
+def print_table(results: List[LoadTestResult]):
+    print(f"{'mode':<10}{'target/s':>10}{'sent/s':>10}{'done/s':>10}{'requests':>10}{'errors':>8}"
+          f"{'p50_ms':>10}{'p99_ms':>10}{'p999_ms':>10}{'max_ms':>10}")
+    for r in results:
+        print(f"{r.mode:<10}{r.target_rate:>10.0f}{r.send_rate:>10.0f}{r.achieved_rate:>10.0f}"
+              f"{r.requests:>10}{r.failures:>8}"
+              f"{r.p50_ms:>10.2f}{r.p99_ms:>10.2f}{r.p999_ms:>10.2f}{r.max_ms:>10.2f}")
+
+
+def parse_mix(items: List[str]) -> Dict[PaymentType, float]:
+    """解析 ["paypal=3", "credit_card=1"]"""
+    mix = {}
+    for item in items:
+        name, _, weight = item.partition("=")
+        mix[PaymentType(name)] = float(weight or 1)
+    return mix
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="PaymentProcessor 压测")
+    parser.add_argument("--mode", choices=["sync", "threaded", "async"], default="async")
+    parser.add_argument("--rate", type=float, default=500, help="目标速率（笔/秒）")
+    parser.add_argument("--duration", type=float, default=3.0, help="每轮持续时间（秒）")
+    parser.add_argument("--workers", type=int, default=64, help="threaded 模式的线程数")
+    parser.add_argument("--mix", nargs="+", default=["paypal=2", "credit_card=1", "bank_transfer=1"],
+                        help="支付类型比例，如 paypal=3 credit_card=1")
+    parser.add_argument("--latency", default="lognormal:10:0.5",
+                        help="模拟渠道延迟分布，如 constant:10、exponential:10、lognormal:10:0.5（毫秒）")
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--find-max", action="store_true", help="逐步加压寻找最大可持续吞吐量")
+    parser.add_argument("--slo-p99", type=float, default=100.0, help="--find-max 使用的 p99 上限（毫秒）")
+    parser.add_argument("--json", help="输出 JSON 报告路径")
+    args = parser.parse_args(argv)
+
+    mix = parse_mix(args.mix)
+    install_mock_providers(mix, parse_latency(args.latency), args.failure_rate)
+    generator = LoadGenerator(mix)
+    kwargs = {"workers": args.workers} if args.mode == "threaded" else {}
+
+    if args.find_max:
+        best, results = generator.find_max_throughput(args.mode, args.rate, args.slo_p99, args.duration, **kwargs)
+        print_table(results)
+        reason = results[-1].violation(args.slo_p99)
+        if best is None:
+            print(f"起始速率 {args.rate:.0f}/s 已不可持续: {reason}")
+        else:
+            print(f"最大可持续吞吐量: {best.achieved_rate:.0f}/s (p99 {best.p99_ms:.2f}ms)")
+            if reason is not None:
+                print(f"下一档 {results[-1].target_rate:.0f}/s 不可持续: {reason}")
+    else:
+        results = [generator.run(args.mode, args.rate, args.duration, **kwargs)]
+        print_table(results)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump([asdict(r) for r in results], f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
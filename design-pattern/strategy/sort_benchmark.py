@@ -0,0 +1,250 @@
+"""
+排序策略基准测试
+
+对 strategy.py 中的每个 SortStrategy，在多种输入分布、多种规模下测量：
+耗时、比较次数、写入次数（对输入数组的元素写入）、峰值内存（tracemalloc），
+并输出 CSV / JSON 报告，可与保存的基线做回归对比。
+
+用法:
+    python sort_benchmark.py --sizes 10 100 1000 10000 --json report.json
+    python sort_benchmark.py --baseline report.json  # 与基线对比，有回归时退出码为 1
+"""
+import argparse
+import csv
+import json
+import random
+import sys
+import time
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, List, Optional
+
+from strategy import (AdaptiveSortStrategy, AllocationTracker, AutoSortStrategy, BubbleSortStrategy,
+                      BucketSortStrategy, ComparisonCounter, CountingSortStrategy, MergeSortStrategy,
+                      MoveCounter, NumPySortStrategy, ParallelMergeSortStrategy, QuickSortStrategy,
+                      RadixSortStrategy, SortInstrument, SortStats, SortStrategy, Sorter)
+
+
+# ==================== 输入分布 ====================
+
+def _random(n: int, rng: random.Random) -> List[int]:
+    return [rng.randrange(n) for _ in range(n)]
+
+
+def _sorted(n: int, rng: random.Random) -> List[int]:
+    return list(range(n))
+
+
+def _reversed(n: int, rng: random.Random) -> List[int]:
+    return list(range(n, 0, -1))
+
+
+def _sawtooth(n: int, rng: random.Random) -> List[int]:
+    period = max(2, n // 10)
+    return [i % period for i in range(n)]
+
+
+def _many_duplicates(n: int, rng: random.Random) -> List[int]:
+    return [rng.randrange(10) for _ in range(n)]
+
+
+def _nearly_sorted(n: int, rng: random.Random) -> List[int]:
+    data = list(range(n))
+    for _ in range(max(1, n // 100)):
+        i, j = rng.randrange(n), rng.randrange(n)
+        data[i], data[j] = data[j], data[i]
+    return data
+
+
+DISTRIBUTIONS: Dict[str, Callable[[int, random.Random], List[int]]] = {
+    "random": _random,
+    "sorted": _sorted,
+    "reversed": _reversed,
+    "sawtooth": _sawtooth,
+    "many_duplicates": _many_duplicates,
+    "nearly_sorted": _nearly_sorted,
+}
+
+
+def default_strategies() -> Dict[str, SortStrategy]:
+    """参与测试的策略；未安装 numpy 时跳过 NumPySortStrategy"""
+    strategies = {
+        "bubble": BubbleSortStrategy(),
+        "quick": QuickSortStrategy(),
+        "merge": MergeSortStrategy(),
+        "adaptive": AdaptiveSortStrategy(),
+        "counting": CountingSortStrategy(),
+        "radix": RadixSortStrategy(),
+        "bucket": BucketSortStrategy(),
+        "parallel_merge": ParallelMergeSortStrategy(),
+        "auto": AutoSortStrategy(),
+    }
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        pass
+    else:
+        strategies["numpy"] = NumPySortStrategy()
+    return strategies
+
+
+# O(n^2) 的策略只在小规模上测试
+QUADRATIC = {"bubble"}
+
+
+# ==================== 测试执行 ====================
+
+@dataclass
+class BenchmarkResult:
+    """单次基准测试结果"""
+    strategy: str
+    distribution: str
+    size: int
+    seconds: float  # 多次重复中的最短耗时
+    comparisons: Optional[int]  # 比较次数，非比较排序或规模超过 count_limit 时为 None
+    moves: Optional[int]  # 对输入数组的元素写入次数
+    peak_bytes: int  # tracemalloc 记录的峰值内存
+
+
+def _measure(strategy: SortStrategy, data: List, *instruments: SortInstrument) -> SortStats:
+    """单独启用指定插桩跑一次，避免各项统计的开销相互干扰"""
+    sorter = Sorter(strategy)
+    sorter.enable_stats(*instruments)
+    sorter.perform_sort(data)
+    return sorter.last_stats
+
+
+def run_benchmark(strategies: Dict[str, SortStrategy] = None, sizes: List[int] = None,
+                  distributions: List[str] = None, repeat: int = 3, count_limit: int = 50_000,
+                  quadratic_limit: int = 5_000, seed: int = 42) -> List[BenchmarkResult]:
+    """
+    运行基准测试
+    :param strategies: 名称到策略的映射，默认 default_strategies()
+    :param sizes: 输入规模列表
+    :param distributions: 输入分布名称列表，默认全部
+    :param repeat: 计时重复次数，取最短时间
+    :param count_limit: 规模超过该值时不统计比较/写入次数（包装元素很慢）
+    :param quadratic_limit: O(n^2) 策略的最大测试规模
+    :param seed: 随机种子，保证各次运行输入一致
+    """
+    strategies = strategies or default_strategies()
+    sizes = sizes or [10, 100, 1_000, 10_000]
+    distributions = distributions or list(DISTRIBUTIONS)
+
+    results = []
+    for size in sizes:
+        for dist in distributions:
+            data = DISTRIBUTIONS[dist](size, random.Random(seed))
+            expected = sorted(data)
+            for name, strategy in strategies.items():
+                if name in QUADRATIC and size > quadratic_limit:
+                    continue
+
+                best = float("inf")
+                for _ in range(repeat):
+                    copy = data.copy()
+                    start = time.perf_counter()
+                    result = strategy.sort(copy)
+                    best = min(best, time.perf_counter() - start)
+                if list(result) != expected:
+                    raise AssertionError(f"{name} produced unsorted output on {dist}/{size}")
+
+                counts = SortStats()
+                if size <= count_limit:
+                    counts = _measure(strategy, data, ComparisonCounter(), MoveCounter())
+                results.append(BenchmarkResult(
+                    strategy=name,
+                    distribution=dist,
+                    size=size,
+                    seconds=best,
+                    comparisons=counts.comparisons,
+                    moves=counts.moves,
+                    peak_bytes=_measure(strategy, data, AllocationTracker()).peak_bytes,
+                ))
+    return results
+
+
+# ==================== 报告与回归检查 ====================
+
+def write_csv(results: List[BenchmarkResult], path: str):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=list(BenchmarkResult.__dataclass_fields__))
+        writer.writeheader()
+        for r in results:
+            writer.writerow(asdict(r))
+
+
+def write_json(results: List[BenchmarkResult], path: str):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump([asdict(r) for r in results], f, indent=2)
+
+
+def load_json(path: str) -> List[BenchmarkResult]:
+    with open(path, "r", encoding="utf-8") as f:
+        return [BenchmarkResult(**r) for r in json.load(f)]
+
+
+def check_regression(results: List[BenchmarkResult], baseline: List[BenchmarkResult],
+                     tolerance: float = 0.25, min_seconds: float = 1e-3) -> List[str]:
+    """
+    与基线对比
+    :param tolerance: 允许的耗时增长比例
+    :param min_seconds: 基线耗时低于该值时忽略计时噪声，只比较比较次数
+    :return: 回归描述列表，为空表示没有回归
+    """
+    base = {(r.strategy, r.distribution, r.size): r for r in baseline}
+    regressions = []
+    for r in results:
+        b = base.get((r.strategy, r.distribution, r.size))
+        if b is None:
+            continue
+        label = f"{r.strategy}/{r.distribution}/{r.size}"
+        if b.seconds >= min_seconds and r.seconds > b.seconds * (1 + tolerance):
+            regressions.append(f"{label}: {b.seconds:.6f}s -> {r.seconds:.6f}s")
+        if b.comparisons is not None and r.comparisons is not None and r.comparisons > b.comparisons:
+            regressions.append(f"{label}: comparisons {b.comparisons} -> {r.comparisons}")
+    return regressions
+
+
+def print_table(results: List[BenchmarkResult]):
+    print(f"{'strategy':<16}{'distribution':<17}{'size':>10}{'seconds':>12}"
+          f"{'comparisons':>14}{'moves':>12}{'peak_kb':>10}")
+    for r in results:
+        comparisons = "-" if r.comparisons is None else r.comparisons
+        moves = "-" if r.moves is None else r.moves
+        print(f"{r.strategy:<16}{r.distribution:<17}{r.size:>10}{r.seconds:>12.6f}"
+              f"{comparisons:>14}{moves:>12}{r.peak_bytes / 1024:>10.1f}")
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="SortStrategy 基准测试")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1_000, 10_000])
+    parser.add_argument("--distributions", nargs="+", choices=list(DISTRIBUTIONS))
+    parser.add_argument("--strategies", nargs="+", help="只测试指定的策略名称")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--csv", help="输出 CSV 报告路径")
+    parser.add_argument("--json", help="输出 JSON 报告路径（可作为基线）")
+    parser.add_argument("--baseline", help="用于回归对比的 JSON 基线")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args(argv)
+
+    strategies = default_strategies()
+    if args.strategies:
+        strategies = {k: v for k, v in strategies.items() if k in args.strategies}
+
+    results = run_benchmark(strategies, args.sizes, args.distributions, args.repeat)
+    print_table(results)
+    if args.csv:
+        write_csv(results, args.csv)
+    if args.json:
+        write_json(results, args.json)
+
+    if args.baseline:
+        regressions = check_regression(results, load_json(args.baseline), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
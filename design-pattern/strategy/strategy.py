@@ -1,13 +1,248 @@
+import array
+import heapq
+import marshal
+import math
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
 from abc import ABC, abstractmethod
-from typing import List
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from dataclasses import dataclass, fields
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple, Union
+
+
+# 原地排序辅助函数（均作用于半开区间 [lo, hi)）
+# a 为参与比较的数组；v 不为 None 时是与 a 平行的值数组，随 a 一起移动
+def _insertion_sort(a: List, lo: int, hi: int, v: List = None) -> None:
+    """插入排序，适合小区间"""
+    for i in range(lo + 1, hi):
+        x = a[i]
+        j = i - 1
+        while j >= lo and x < a[j]:
+            j -= 1
+        j += 1
+        if j < i:
+            # 整体后移一位后插入
+            a[j + 1:i + 1] = a[j:i]
+            a[j] = x
+            if v is not None:
+                y = v[i]
+                v[j + 1:i + 1] = v[j:i]
+                v[j] = y
+
+
+def _sift_down(a: List, lo: int, root: int, end: int, v: List = None) -> None:
+    """大顶堆下沉，堆元素为 a[lo:lo + end]"""
+    while True:
+        child = 2 * root + 1
+        if child >= end:
+            return
+        if child + 1 < end and a[lo + child] < a[lo + child + 1]:
+            child += 1
+        if a[lo + root] < a[lo + child]:
+            a[lo + root], a[lo + child] = a[lo + child], a[lo + root]
+            if v is not None:
+                v[lo + root], v[lo + child] = v[lo + child], v[lo + root]
+            root = child
+        else:
+            return
+
+
+def _heapsort(a: List, lo: int, hi: int, v: List = None) -> None:
+    """原地堆排序，最坏 O(n log n)"""
+    n = hi - lo
+    for start in range(n // 2 - 1, -1, -1):
+        _sift_down(a, lo, start, n, v)
+    for end in range(n - 1, 0, -1):
+        a[lo], a[lo + end] = a[lo + end], a[lo]
+        if v is not None:
+            v[lo], v[lo + end] = v[lo + end], v[lo]
+        _sift_down(a, lo, 0, end, v)
+
+
+def _swap(a: List, v: Optional[List], i: int, j: int) -> None:
+    a[i], a[j] = a[j], a[i]
+    if v is not None:
+        v[i], v[j] = v[j], v[i]
+
+
+def _partition(a: List, lo: int, hi: int, v: List = None) -> int:
+    """
+    三数取中 + Hoare 分区
+    返回 p，使 a[lo:p] 中元素都 <= a[p:hi] 中元素，且两侧均非空（要求 hi - lo >= 3）
+    """
+    mid = (lo + hi - 1) // 2
+    last = hi - 1
+    # 将 a[lo]、a[mid]、a[last] 排好序，a[mid] 即为三者中位数
+    if a[mid] < a[lo]:
+        _swap(a, v, lo, mid)
+    if a[last] < a[mid]:
+        _swap(a, v, mid, last)
+        if a[mid] < a[lo]:
+            _swap(a, v, lo, mid)
+    pivot = a[mid]
+
+    i, j = lo - 1, hi
+    while True:
+        i += 1
+        while a[i] < pivot:
+            i += 1
+        j -= 1
+        while pivot < a[j]:
+            j -= 1
+        if i >= j:
+            return j + 1
+        a[i], a[j] = a[j], a[i]
+        if v is not None:
+            v[i], v[j] = v[j], v[i]
+
+
+def _find_runs(a: List, limit: int, v: List = None) -> List[int]:
+    """
+    扫描自然有序段（run），严格降序段原地翻转为升序
+    返回各 run 的边界 [0, b1, ..., n]；run 数超过 limit 时提前返回 None
+    """
+    n = len(a)
+    bounds = [0]
+    lo = 0
+    while lo < n:
+        hi = lo + 1
+        if hi < n and a[hi] < a[hi - 1]:
+            # 严格降序段（保证翻转后仍是稳定的）
+            while hi < n and a[hi] < a[hi - 1]:
+                hi += 1
+            a[lo:hi] = a[lo:hi][::-1]
+            if v is not None:
+                v[lo:hi] = v[lo:hi][::-1]
+        else:
+            while hi < n and not a[hi] < a[hi - 1]:
+                hi += 1
+        bounds.append(hi)
+        if len(bounds) - 1 > limit:
+            return None
+        lo = hi
+    return bounds
+
+
+def _merge_lo(a: List, lo: int, mid: int, hi: int, v: List = None) -> None:
+    """合并相邻有序段 a[lo:mid] 与 a[mid:hi]，只为左段分配缓冲区"""
+    if not a[mid] < a[mid - 1]:
+        return  # 两段已经首尾相接有序
+    left = a[lo:mid]
+    left_v = v[lo:mid] if v is not None else None
+    nl = len(left)
+    i, j, k = 0, mid, lo
+    while i < nl and j < hi:
+        if a[j] < left[i]:
+            a[k] = a[j]
+            if v is not None:
+                v[k] = v[j]
+            j += 1
+        else:
+            a[k] = left[i]
+            if v is not None:
+                v[k] = left_v[i]
+            i += 1
+        k += 1
+    if i < nl:
+        a[k:hi] = left[i:]
+        if v is not None:
+            v[k:hi] = left_v[i:]
+
+
+def _merge_runs(a: List, bounds: List[int], v: List = None) -> None:
+    """自底向上两两合并相邻的 run"""
+    while len(bounds) > 2:
+        merged = [bounds[0]]
+        for i in range(0, len(bounds) - 2, 2):
+            _merge_lo(a, bounds[i], bounds[i + 1], bounds[i + 2], v)
+            merged.append(bounds[i + 2])
+        if len(bounds) % 2 == 0:
+            merged.append(bounds[-1])  # run 数为奇数，最后一段留到下一轮
+        bounds = merged
+
+
+def _introsort(a: List, lo: int, hi: int, depth: int, cutoff: int, v: List = None) -> None:
+    """内省排序：快速排序为主，递归过深时改用堆排序，小区间用插入排序"""
+    while hi - lo > cutoff:
+        if depth == 0:
+            _heapsort(a, lo, hi, v)
+            return
+        depth -= 1
+        p = _partition(a, lo, hi, v)
+        # 递归处理较短的一侧，较长的一侧继续循环，栈深度为 O(log n)
+        if p - lo < hi - p:
+            _introsort(a, lo, p, depth, cutoff, v)
+            lo = p
+        else:
+            _introsort(a, p, hi, depth, cutoff, v)
+            hi = p
+    _insertion_sort(a, lo, hi, v)
+
+
+def _introselect(a: List, k: int, v: List = None) -> None:
+    """
+    内省选择：原地重排使 a[k] 为第 k 小元素，且 a[:k] <= a[k] <= a[k + 1:]
+    以三数取中快速选择为主，期望 O(n)；分区过深时对剩余区间堆排序，最坏 O(n log n)
+    """
+    lo, hi = 0, len(a)
+    depth = 2 * len(a).bit_length()
+    while hi - lo > 16:
+        if depth == 0:
+            _heapsort(a, lo, hi, v)
+            return
+        depth -= 1
+        p = _partition(a, lo, hi, v)
+        if k < p:
+            hi = p
+        else:
+            lo = p
+    _insertion_sort(a, lo, hi, v)
 
 
 # 策略接口
 class SortStrategy(ABC):
     """排序策略抽象类"""
 
+    # 是否直接接收 array.array / memoryview / numpy 数组（Sorter 不再先复制一份列表）
+    accepts_buffers = False
+    # 是否稳定：键相等的元素保持原有的相对顺序
+    is_stable = False
+    # 是否只通过比较运算排序（可以用包装键统计比较次数）
+    comparison_based = True
+
+    def sort(self, data: List, key: Callable = None, reverse: bool = False) -> List:
+        """
+        排序
+        :param data: 待排序数据
+        :param key: 键函数，每个元素只计算一次，结果缓存在与 data 平行的数组中（不构造元组）
+        :param reverse: 是否降序；先翻转输入、升序排序后再翻转，稳定策略降序时仍然稳定
+        """
+        if reverse:
+            data.reverse()
+        keys = [key(x) for x in data] if key is not None else None
+        result = self._sort(data, keys)
+        if reverse:
+            result.reverse()
+        return result
+
+    def resolve(self, data: List, key: Callable = None, reverse: bool = False) -> "SortStrategy":
+        """
+        返回实际执行排序的策略，默认为自身
+        分派型策略（如 AutoSortStrategy）在这里按未包装的原始数据做出选择，
+        Sorter 启用统计时据此插桩，避免包装后的键改变分派结果
+        """
+        return self
+
     @abstractmethod
-    def sort(self, data: List) -> List:
+    def _sort(self, data: List, keys: List = None) -> List:
+        """
+        升序排序的具体实现
+        keys 为 None 时直接比较元素；否则按 keys 比较，data 作为平行数组随之移动
+        """
         pass
 
 
@@ -15,41 +250,63 @@ class SortStrategy(ABC):
 class BubbleSortStrategy(SortStrategy):
     """冒泡排序策略"""
 
-    def sort(self, data: List) -> List:
-        print("使用冒泡排序")
-        n = len(data)
+    is_stable = True
+
+    def _sort(self, data: List, keys: List = None) -> List:
+        a = data if keys is None else keys
+        n = len(a)
         for i in range(n):
             for j in range(0, n - i - 1):
-                if data[j] > data[j + 1]:
-                    data[j], data[j + 1] = data[j + 1], data[j]
+                if a[j] > a[j + 1]:
+                    a[j], a[j + 1] = a[j + 1], a[j]
+                    if keys is not None:
+                        data[j], data[j + 1] = data[j + 1], data[j]
         return data
 
 
 class QuickSortStrategy(SortStrategy):
     """快速排序策略"""
 
-    def sort(self, data: List) -> List:
-        print("使用快速排序")
+    is_stable = True  # 三路划分按原顺序收集元素，相等元素的相对顺序不变
+
+    def _sort(self, data: List, keys: List = None) -> List:
         if len(data) <= 1:
             return data
-        pivot = data[len(data) // 2]
-        left = [x for x in data if x < pivot]
-        middle = [x for x in data if x == pivot]
-        right = [x for x in data if x > pivot]
-        return self.sort(left) + middle + self.sort(right)
+        if keys is None:
+            pivot = data[len(data) // 2]
+            left = [x for x in data if x < pivot]
+            middle = [x for x in data if x == pivot]
+            right = [x for x in data if x > pivot]
+            return self._sort(left) + middle + self._sort(right)
+
+        pivot = keys[len(keys) // 2]
+        left_keys, left, middle, right_keys, right = [], [], [], [], []
+        for k, x in zip(keys, data):
+            if k < pivot:
+                left_keys.append(k)
+                left.append(x)
+            elif pivot < k:
+                right_keys.append(k)
+                right.append(x)
+            else:
+                middle.append(x)
+        return self._sort(left, left_keys) + middle + self._sort(right, right_keys)
 
 
 class MergeSortStrategy(SortStrategy):
     """归并排序策略"""
 
-    def sort(self, data: List) -> List:
-        print("使用归并排序")
+    is_stable = True
+
+    def _sort(self, data: List, keys: List = None) -> List:
+        if keys is not None:
+            return self._sort_keyed(keys, data)[1]
         if len(data) <= 1:
             return data
 
         mid = len(data) // 2
-        left = self.sort(data[:mid])
-        right = self.sort(data[mid:])
+        left = self._sort(data[:mid])
+        right = self._sort(data[mid:])
 
         return self._merge(left, right)
 
@@ -58,17 +315,854 @@ class MergeSortStrategy(SortStrategy):
         i = j = 0
 
         while i < len(left) and j < len(right):
-            if left[i] < right[j]:
-                result.append(left[i])
-                i += 1
-            else:
+            # 相等时先取左侧元素，保证稳定
+            if right[j] < left[i]:
                 result.append(right[j])
                 j += 1
+            else:
+                result.append(left[i])
+                i += 1
 
         result.extend(left[i:])
         result.extend(right[j:])
         return result
 
+    def _sort_keyed(self, keys: List, data: List) -> Tuple[List, List]:
+        """按 keys 归并排序，返回 (有序的 keys, 对应的 data)"""
+        if len(data) <= 1:
+            return keys, data
+
+        mid = len(data) // 2
+        left_keys, left = self._sort_keyed(keys[:mid], data[:mid])
+        right_keys, right = self._sort_keyed(keys[mid:], data[mid:])
+
+        out_keys, out = [], []
+        i = j = 0
+        while i < len(left) and j < len(right):
+            if right_keys[j] < left_keys[i]:
+                out_keys.append(right_keys[j])
+                out.append(right[j])
+                j += 1
+            else:
+                out_keys.append(left_keys[i])
+                out.append(left[i])
+                i += 1
+
+        out_keys.extend(left_keys[i:])
+        out_keys.extend(right_keys[j:])
+        out.extend(left[i:])
+        out.extend(right[j:])
+        return out_keys, out
+
+
+class AdaptiveSortStrategy(SortStrategy):
+    """
+    自适应混合排序策略（原地）
+    - 先扫描已有的有序段，整体有序（或整体降序）时 O(n) 完成；
+    - 有序段较少时按段自然归并（Timsort 思路），只为左段分配缓冲区；
+    - 否则使用内省排序：三数取中分区、小区间插入排序、递归过深时退化为堆排序，
+      保证最坏 O(n log n)。
+    """
+
+    def __init__(self, insertion_cutoff: int = 16, max_runs: int = None):
+        """
+        :param insertion_cutoff: 区间长度不超过该值时使用插入排序
+        :param max_runs: 有序段数量不超过该值时走自然归并，默认取 log2(n)
+        """
+        if insertion_cutoff < 2:
+            raise ValueError("insertion_cutoff must be at least 2")
+        self._cutoff = insertion_cutoff
+        self._max_runs = max_runs
+
+    def _sort(self, data: List, keys: List = None) -> List:
+        n = len(data)
+        if n < 2:
+            return data
+        a, v = (data, None) if keys is None else (keys, data)
+        limit = self._max_runs if self._max_runs is not None else max(2, n.bit_length())
+        bounds = _find_runs(a, limit, v)
+        if bounds is not None:
+            _merge_runs(a, bounds, v)
+        else:
+            _introsort(a, 0, n, 2 * n.bit_length(), self._cutoff, v)
+        return data
+
+
+def _require_ints(data: List) -> Tuple[int, int]:
+    """校验元素全部为整数，返回 (最小值, 最大值)"""
+    for x in data:
+        if type(x) is not int:
+            raise TypeError(f"Integer sort requires int elements, got {type(x).__name__}")
+    return min(data), max(data)
+
+
+class CountingSortStrategy(SortStrategy):
+    """计数排序策略（整数，取值范围较小时 O(n + k)）"""
+
+    is_stable = True
+    comparison_based = False
+
+    def __init__(self, max_span: int = 1 << 20):
+        """
+        :param max_span: 允许的最大取值跨度 max - min，超出时拒绝排序以免计数数组过大
+        """
+        self._max_span = max_span
+
+    def _sort(self, data: List, keys: List = None) -> List:
+        if len(data) < 2:
+            return data
+        lo, hi = _require_ints(data if keys is None else keys)
+        span = hi - lo
+        if span > self._max_span:
+            raise ValueError(f"Key span {span} exceeds max_span {self._max_span}")
+
+        count = [0] * (span + 1)
+        for x in (data if keys is None else keys):
+            count[x - lo] += 1
+
+        if keys is None:
+            # 按计数依次回写
+            k = 0
+            for offset, c in enumerate(count):
+                if c:
+                    data[k:k + c] = [lo + offset] * c
+                    k += c
+            return data
+
+        # 前缀和得到每个键的起始位置，按原顺序放置（稳定）
+        pos = 0
+        for offset, c in enumerate(count):
+            count[offset] = pos
+            pos += c
+        out = [None] * len(data)
+        for k, x in zip(keys, data):
+            out[count[k - lo]] = x
+            count[k - lo] += 1
+        data[:] = out
+        return data
+
+
+class RadixSortStrategy(SortStrategy):
+    """
+    基数排序策略（LSD，按字节分桶，O(n * k)）
+    先减去最小值把所有元素平移到非负区间，因此支持负数
+    """
+
+    is_stable = True
+    comparison_based = False
+
+    def _sort(self, data: List, keys: List = None) -> List:
+        if len(data) < 2:
+            return data
+        lo, hi = _require_ints(data if keys is None else keys)
+        passes = ((hi - lo).bit_length() + 7) // 8
+
+        if keys is None:
+            a = data
+            for p in range(passes):
+                shift = 8 * p
+                buckets = [[] for _ in range(256)]
+                for x in a:
+                    buckets[((x - lo) >> shift) & 0xFF].append(x)
+                a = [x for bucket in buckets for x in bucket]
+            data[:] = a
+            return data
+
+        # 有键时对下标分桶，最后按下标重排数据
+        order = range(len(data))
+        for p in range(passes):
+            shift = 8 * p
+            buckets = [[] for _ in range(256)]
+            for i in order:
+                buckets[((keys[i] - lo) >> shift) & 0xFF].append(i)
+            order = [i for bucket in buckets for i in bucket]
+        data[:] = [data[i] for i in order]
+        return data
+
+
+class BucketSortStrategy(SortStrategy):
+    """桶排序策略（浮点数，数据在 [min, max] 上近似均匀分布时期望 O(n)）"""
+
+    comparison_based = False
+
+    def __init__(self, bucket_count: int = None):
+        """
+        :param bucket_count: 桶的数量，默认与元素个数相同
+        """
+        self._bucket_count = bucket_count
+
+    def _sort(self, data: List, keys: List = None) -> List:
+        n = len(data)
+        if n < 2:
+            return data
+        a = data if keys is None else keys
+        for x in a:
+            if not isinstance(x, (int, float)) or isinstance(x, bool):
+                raise TypeError(f"Bucket sort requires real numbers, got {type(x).__name__}")
+        lo, hi = min(a), max(a)
+        if not (math.isfinite(lo) and math.isfinite(hi)):
+            raise ValueError("Bucket sort requires finite values")
+        if lo == hi:
+            return data
+
+        bucket_count = self._bucket_count or n
+        scale = bucket_count / (hi - lo)
+        buckets = [[] for _ in range(bucket_count)]
+        # 有键时桶里放下标，否则直接放元素
+        for i, x in enumerate(a):
+            # 最大值会落在 bucket_count 上，归入最后一个桶
+            buckets[min(int((x - lo) * scale), bucket_count - 1)].append(x if keys is None else i)
+
+        out = []
+        for bucket in buckets:
+            m = len(bucket)
+            if m > 1:
+                if keys is None:
+                    _introsort(bucket, 0, m, 2 * m.bit_length(), 16)
+                else:
+                    bucket_keys = [keys[i] for i in bucket]
+                    _introsort(bucket_keys, 0, m, 2 * m.bit_length(), 16, bucket)
+            out.extend(bucket if keys is None else [data[i] for i in bucket])
+        data[:] = out
+        return data
+
+
+class NumPySortStrategy(SortStrategy):
+    """
+    NumPy 向量化排序策略（可选依赖 numpy）
+    array.array、memoryview 通过缓冲区协议零拷贝地包装为 ndarray，
+    排序在 NumPy 的 C 内核中完成，返回与输入同类型的容器。
+    kind 透传给 numpy.sort：整数在 kind="stable" 时会使用基数排序。
+    """
+
+    accepts_buffers = True
+    comparison_based = False
+    KINDS = ("quicksort", "mergesort", "heapsort", "stable")
+
+    def __init__(self, kind: str = "quicksort", in_place: bool = False):
+        """
+        :param kind: NumPy 排序算法
+        :param in_place: 为 True 时直接在输入的缓冲区上排序并返回输入本身（列表除外）
+        """
+        if kind not in self.KINDS:
+            raise ValueError(f"kind must be one of {self.KINDS}")
+        self._kind = kind
+        self._in_place = in_place
+
+    @property
+    def is_stable(self) -> bool:
+        return self._kind in ("mergesort", "stable")
+
+    def sort(self, data, key: Callable = None, reverse: bool = False):
+        # 缓冲区不一定支持 reverse()，降序由 argsort 处理
+        keys = [key(x) for x in data] if key is not None else None
+        return self._numpy_sort(data, keys, reverse)
+
+    def _sort(self, data, keys: List = None):
+        return self._numpy_sort(data, keys, False)
+
+    def _numpy_sort(self, data, keys: Optional[List], reverse: bool):
+        try:
+            import numpy as np
+        except ImportError:
+            raise ImportError("NumPySortStrategy requires numpy (pip install numpy)")
+
+        plain = keys is None and not reverse
+        if isinstance(data, list):
+            # 列表无法共享缓冲区，只能转换一次
+            values = self._key_array(np, data) if keys is None else None
+            if plain and values.dtype != object:
+                result = np.sort(values, kind=self._kind).tolist()
+            else:
+                order = self._argsort(np, values if keys is None else self._key_array(np, keys), reverse)
+                result = [data[i] for i in order.tolist()]
+            if self._in_place:
+                data[:] = result
+                return data
+            return result
+
+        arr = np.asarray(data)  # ndarray 原样返回；array.array、memoryview 为零拷贝视图
+        if plain and self._in_place:
+            arr.sort(kind=self._kind)
+            return data
+
+        if plain:
+            result = np.sort(arr, kind=self._kind)
+        else:
+            result = arr[self._argsort(np, arr if keys is None else self._key_array(np, keys), reverse)]
+        if self._in_place:
+            arr[...] = result
+            return data
+
+        if isinstance(data, np.ndarray):
+            return result
+        if isinstance(data, array.array):
+            out = array.array(data.typecode)
+            out.frombytes(result.tobytes())
+            return out
+        return memoryview(result)
+
+    @staticmethod
+    def _key_array(np, keys: List):
+        """
+        把键转换为一维数组；元组等非标量键会被 np.asarray 展开成二维数组，
+        此时改用 dtype=object 的一维数组，按 Python 的比较规则排序
+        """
+        try:
+            arr = np.asarray(keys)
+        except ValueError:  # 长度不一的序列
+            arr = None
+        if arr is not None and arr.ndim == 1:
+            return arr
+        objects = np.empty(len(keys), dtype=object)
+        for i, k in enumerate(keys):
+            objects[i] = k
+        return objects
+
+    def _argsort(self, np, keys, reverse: bool):
+        if not reverse:
+            return np.argsort(keys, kind=self._kind)
+        # 对翻转后的键升序排序再翻转回来：降序，且相等元素保持原有顺序
+        n = len(keys)
+        return (n - 1 - np.argsort(keys[::-1], kind=self._kind))[::-1]
+
+
+def _sort_chunk(chunk: List, strategy: SortStrategy) -> List:
+    """子进程：排序一个以 pickle 传入的分块"""
+    return strategy.sort(chunk)
+
+
+def _argsort_chunk(keys: List, strategy: SortStrategy) -> Tuple[List, List[int]]:
+    """子进程：按键排序分块内的下标，返回 (有序的键, 对应下标)"""
+    order = strategy._sort(list(range(len(keys))), keys.copy())
+    return [keys[i] for i in order], order
+
+
+def _sort_shared_chunk(name: str, typecode: str, lo: int, hi: int, strategy: SortStrategy) -> None:
+    """子进程：在共享内存上原地排序 [lo, hi) 分块"""
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        view = shm.buf.cast(typecode)
+        chunk = strategy.sort(view[lo:hi].tolist())
+        view[lo:hi] = array.array(typecode, chunk)
+        view.release()
+    finally:
+        shm.close()
+
+
+def _shared_typecode(data: List) -> Optional[str]:
+    """数据能否放入共享内存：全部为 float 返回 'd'，全部为 64 位整数返回 'q'，否则 None"""
+    if all(type(x) is float for x in data):
+        return "d"
+    if all(type(x) is int for x in data) and -(1 << 63) <= min(data) and max(data) < (1 << 63):
+        return "q"
+    return None
+
+
+class ParallelMergeSortStrategy(SortStrategy):
+    """
+    多进程归并排序策略
+    将输入切成 workers 个分块，在进程池中并行排序，再用堆做 k 路归并。
+    float / 64 位整数数据通过共享内存交给子进程，其余数据以 pickle 传递；
+    小于 threshold 的输入直接在当前进程串行排序，避免进程开销。
+    """
+
+    def __init__(self, workers: int = None, threshold: int = 100_000,
+                 chunk_strategy: SortStrategy = None):
+        """
+        :param workers: 进程数，默认为 CPU 核数
+        :param threshold: 元素个数低于该值时走串行路径
+        :param chunk_strategy: 排序每个分块（以及串行路径）所用的策略，默认 AdaptiveSortStrategy
+        """
+        self._workers = workers or os.cpu_count() or 1
+        self._threshold = threshold
+        self._chunk_strategy = chunk_strategy or AdaptiveSortStrategy()
+
+    # 比较发生在子进程中，无法在当前进程统计
+    comparison_based = False
+
+    @property
+    def is_stable(self) -> bool:
+        # heapq.merge 遇到相等元素时按分块顺序输出，稳定性取决于分块策略
+        return self._chunk_strategy.is_stable
+
+    def _sort(self, data: List, keys: List = None) -> List:
+        n = len(data)
+        if n < self._threshold or self._workers < 2:
+            return self._chunk_strategy._sort(data, keys)
+
+        size = -(-n // self._workers)
+        bounds = [(lo, min(lo + size, n)) for lo in range(0, n, size)]
+        if keys is not None:
+            # 只把键发给子进程，按 (键, 全局下标) 归并，相等键按原顺序输出
+            with ProcessPoolExecutor(max_workers=self._workers) as pool:
+                futures = [pool.submit(_argsort_chunk, keys[lo:hi], self._chunk_strategy) for lo, hi in bounds]
+                runs = [f.result() for f in futures]
+            merged = heapq.merge(*(zip(run_keys, [lo + i for i in order])
+                                   for (run_keys, order), (lo, _) in zip(runs, bounds)))
+            data[:] = [data[i] for _, i in merged]
+            return data
+
+        typecode = _shared_typecode(data)
+        with ProcessPoolExecutor(max_workers=self._workers) as pool:
+            if typecode is None:
+                futures = [pool.submit(_sort_chunk, data[lo:hi], self._chunk_strategy) for lo, hi in bounds]
+                chunks = [f.result() for f in futures]
+            else:
+                chunks = self._sort_shared(pool, data, typecode, bounds)
+
+        # 堆式 k 路归并
+        data[:] = list(heapq.merge(*chunks))
+        return data
+
+    def _sort_shared(self, pool: ProcessPoolExecutor, data: List, typecode: str,
+                     bounds: List[Tuple[int, int]]) -> List[List]:
+        """把数据写入共享内存，子进程各自原地排序分块后读回"""
+        buf = array.array(typecode, data)
+        shm = shared_memory.SharedMemory(create=True, size=max(1, len(buf) * buf.itemsize))
+        try:
+            view = shm.buf.cast(typecode)
+            view[:] = buf
+            del buf
+            futures = [pool.submit(_sort_shared_chunk, shm.name, typecode, lo, hi, self._chunk_strategy)
+                       for lo, hi in bounds]
+            for f in futures:
+                f.result()
+            chunks = [view[lo:hi].tolist() for lo, hi in bounds]
+            view.release()
+            return chunks
+        finally:
+            shm.close()
+            shm.unlink()
+
+
+@dataclass
+class InputProfile:
+    """输入数据画像（基于抽样估计）"""
+    length: int  # 数据长度
+    runs: int  # 估计的自然有序段数量（升序段或严格降序段）
+    duplicate_ratio: float  # 抽样中的重复元素比例
+    int_span: Optional[int] = None  # 抽样全部为整数时的取值跨度 max - min，否则为 None
+
+    @property
+    def is_integer(self) -> bool:
+        """抽样元素是否全部为整数"""
+        return self.int_span is not None
+
+
+class AutoSortStrategy(SortStrategy):
+    """
+    自动选择排序策略
+    排序前对输入做一次廉价抽样（长度、有序段数、重复率、是否为有界整数），
+    按规则依次匹配，分派给第一个命中的已注册策略。
+    """
+
+    def __init__(self, sample_size: int = 256, default: SortStrategy = None, stable: bool = False):
+        """
+        :param sample_size: 抽样的相邻元素对数量上限
+        :param default: 没有规则命中时使用的策略，默认 AdaptiveSortStrategy（stable 时为 MergeSortStrategy）
+        :param stable: 为 True 时只在稳定策略之间选择
+        """
+        self._sample_size = sample_size
+        self._stable = stable
+        self._default = default or (MergeSortStrategy() if stable else AdaptiveSortStrategy())
+        if stable and not self._default.is_stable:
+            raise ValueError("Default strategy must be stable when stable=True")
+        self._rules: List[Tuple[Callable[[InputProfile], bool], SortStrategy]] = []
+        self._register_default_rules()
+        self.last_profile: Optional[InputProfile] = None
+        self.last_strategy: Optional[SortStrategy] = None
+
+    @property
+    def is_stable(self) -> bool:
+        return self._stable
+
+    def _register_default_rules(self):
+        """注册默认规则（按顺序匹配）"""
+        rules = [
+            # 小数组：跳过有序段扫描，直接插入排序
+            (lambda p: p.length <= 16, AdaptiveSortStrategy(max_runs=0)),
+            # 近乎有序：按有序段自然归并，已有序或逆序时 O(n)，比计数排序更快，因此先于计数排序匹配
+            (lambda p: p.runs <= max(2, p.length.bit_length()), AdaptiveSortStrategy()),
+            # 取值范围小的整数：计数排序
+            (lambda p: p.is_integer and p.int_span <= 2 * p.length, CountingSortStrategy()),
+            # 一般整数：按字节的基数排序
+            (lambda p: p.is_integer, RadixSortStrategy()),
+            # 大量重复：三路划分的快速排序，递归层数只与不同值的个数有关
+            (lambda p: p.duplicate_ratio >= 0.9, QuickSortStrategy()),
+        ]
+        self._rules.extend((when, s) for when, s in rules if s.is_stable or not self._stable)
+
+    def register(self, strategy: SortStrategy, when: Callable[[InputProfile], bool]):
+        """
+        注册策略及其适用条件，新注册的规则优先于已有规则
+        :param strategy: 排序策略
+        :param when: 接收 InputProfile，返回是否使用该策略
+        """
+        if not isinstance(strategy, SortStrategy):
+            raise ValueError("Strategy must implement SortStrategy")
+        if self._stable and not strategy.is_stable:
+            raise ValueError(f"{strategy.__class__.__name__} is not stable")
+        self._rules.insert(0, (when, strategy))
+
+    def profile(self, data: List) -> InputProfile:
+        """对输入等间距抽样，估计数据特征"""
+        n = len(data)
+        if n < 2:
+            return InputProfile(length=n, runs=n, duplicate_ratio=0.0)
+
+        step = max(1, (n - 1) // self._sample_size)
+        positions = range(0, n - 1, step)
+        descents = 0
+        for i in positions:
+            if data[i + 1] < data[i]:
+                descents += 1
+        # _find_runs 把严格降序段翻转成一段，因此整体逆序的输入也只有少数几段
+        runs = 1 + round(min(descents, len(positions) - descents) * (n - 1) / len(positions))
+
+        sample = [data[i] for i in positions]
+        try:
+            duplicate_ratio = 1 - len(set(sample)) / len(sample)
+        except TypeError:  # 元素不可哈希
+            duplicate_ratio = 0.0
+
+        int_span = None
+        if all(type(x) is int for x in sample):
+            int_span = max(sample) - min(sample)
+        return InputProfile(length=n, runs=runs, duplicate_ratio=duplicate_ratio, int_span=int_span)
+
+    def choose(self, data: List) -> SortStrategy:
+        """根据数据画像选择策略"""
+        profile = self.profile(data)
+        strategy = self._default
+        for when, candidate in self._rules:
+            if when(profile):
+                strategy = candidate
+                break
+        self.last_profile = profile
+        self.last_strategy = strategy
+        return strategy
+
+    def resolve(self, data: List, key: Callable = None, reverse: bool = False) -> SortStrategy:
+        # 与 sort 看到的输入一致：降序时先翻转，再计算键
+        items = data[::-1] if reverse else data
+        return self.choose(items if key is None else [key(x) for x in items])
+
+    def _sort(self, data: List, keys: List = None) -> List:
+        strategy = self.choose(data if keys is None else keys)
+        try:
+            return strategy._sort(data, keys)
+        except (TypeError, ValueError):
+            # 抽样只是估计：整数类策略在校验失败时不会改动数据，回退到默认策略
+            if strategy is self._default:
+                raise
+            self.last_strategy = self._default
+            return self._default._sort(data, keys)
+
+# 外部排序
+class ExternalSorter:
+    """
+    外部排序（数据量大于内存时）
+    1. 流式读取记录，内存占用达到 memory_limit 时用排序策略排好一段，
+       以 marshal 二进制格式写入临时文件（一个 run）；
+    2. run 数量超过 max_fan_in 时先分组归并成更大的 run；
+    3. 最后用带缓冲的读取器对所有 run 做堆式 k 路归并，输出到迭代器或文件。
+    """
+
+    def __init__(self, strategy: SortStrategy = None, memory_limit: int = 64 << 20,
+                 max_fan_in: int = 64, tmp_dir: str = None):
+        """
+        :param strategy: 内存中排序每个 run 所用的策略，默认 AdaptiveSortStrategy
+        :param memory_limit: 内存预算（字节），同时决定归并时每个读缓冲区的大小
+        :param max_fan_in: 单次归并最多同时打开的 run 数
+        :param tmp_dir: 临时文件目录，默认使用系统临时目录
+        """
+        if max_fan_in < 2:
+            raise ValueError("max_fan_in must be at least 2")
+        self._strategy = strategy or AdaptiveSortStrategy()
+        self._memory_limit = memory_limit
+        self._max_fan_in = max_fan_in
+        self._tmp_dir = tmp_dir
+
+    def sort(self, source: Union[str, os.PathLike, Iterable], output_path: str = None):
+        """
+        外部排序
+        :param source: 可迭代的记录，或文本文件路径（按行排序，不含换行符）
+        :param output_path: 输出文件路径；为 None 时返回有序记录的迭代器
+        :return: 迭代器，或写入文件的记录数
+        """
+        if isinstance(source, (str, os.PathLike)):
+            records = self._read_lines(source)
+        else:
+            records = iter(source)
+
+        if output_path is None:
+            return self._sorted_iter(records)
+
+        count = 0
+        with open(output_path, "w", encoding="utf-8") as f:
+            for record in self._sorted_iter(records):
+                f.write(f"{record}\n")
+                count += 1
+        return count
+
+    @staticmethod
+    def _read_lines(path) -> Iterator[str]:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                yield line.rstrip("\n")
+
+    def _sorted_iter(self, records: Iterator) -> Iterator:
+        with tempfile.TemporaryDirectory(prefix="extsort-", dir=self._tmp_dir) as tmp:
+            runs, tail = self._spill_runs(records, tmp)
+            if not runs:
+                # 数据能放进内存，无需落盘
+                yield from self._strategy.sort(tail)
+                return
+            if tail:
+                runs.append(self._write_run(self._strategy.sort(tail), tmp, len(runs)))
+            tail = None
+
+            # 多趟归并，直到 run 数不超过 max_fan_in
+            seq = len(runs)
+            while len(runs) > self._max_fan_in:
+                merged = []
+                for i in range(0, len(runs), self._max_fan_in):
+                    group = runs[i:i + self._max_fan_in]
+                    merged.append(self._write_run(self._merge(group), tmp, seq))
+                    seq += 1
+                    for path in group:
+                        os.remove(path)
+                runs = merged
+
+            yield from self._merge(runs)
+
+    def _spill_runs(self, records: Iterator, tmp: str) -> Tuple[List[str], List]:
+        """按内存预算切分并写出有序 run，返回 (run 文件列表, 未写出的最后一段)"""
+        runs = []
+        buf = []
+        used = 0
+        for record in records:
+            buf.append(record)
+            used += sys.getsizeof(record) + 8  # 8 字节为列表中的指针
+            if used >= self._memory_limit:
+                runs.append(self._write_run(self._strategy.sort(buf), tmp, len(runs)))
+                buf = []
+                used = 0
+        return runs, buf
+
+    def _buffer_size(self, fan_in: int) -> int:
+        return max(4096, self._memory_limit // (fan_in + 1))
+
+    def _write_run(self, records: Iterable, tmp: str, seq: int) -> str:
+        path = os.path.join(tmp, f"run-{seq}.bin")
+        with open(path, "wb", buffering=self._buffer_size(self._max_fan_in)) as f:
+            for record in records:
+                marshal.dump(record, f)
+        return path
+
+    @staticmethod
+    def _read_run(path: str, buffer_size: int) -> Iterator:
+        with open(path, "rb", buffering=buffer_size) as f:
+            while True:
+                try:
+                    yield marshal.load(f)
+                except EOFError:
+                    return
+
+    def _merge(self, runs: List[str]) -> Iterator:
+        buffer_size = self._buffer_size(len(runs))
+        return heapq.merge(*(self._read_run(path, buffer_size) for path in runs))
+
+
+# 插桩
+@dataclass
+class SortStats:
+    """一次排序的统计数据，未启用对应插桩的字段为 None"""
+    comparisons: Optional[int] = None  # 比较次数
+    moves: Optional[int] = None  # 对待排序数组的元素写入次数（交换计为两次）
+    max_depth: Optional[int] = None  # 最大递归深度
+    peak_bytes: Optional[int] = None  # 排序期间新分配内存的峰值（字节）
+    elapsed: Optional[float] = None  # 耗时（秒）
+
+    def as_dict(self) -> dict:
+        return {f.name: getattr(self, f.name) for f in fields(self)}
+
+
+class SortInstrument(ABC):
+    """
+    排序插桩接口
+    Sorter 依次调用 prepare（可替换数据或键函数）、start，排序结束后逆序调用 stop
+    """
+
+    def prepare(self, strategy: SortStrategy, data, key: Optional[Callable]):
+        """返回 (data, key)"""
+        return data, key
+
+    def start(self):
+        pass
+
+    @abstractmethod
+    def stop(self, stats: SortStats):
+        """把统计结果写入 stats"""
+        pass
+
+
+class _CountedKey:
+    """包装排序键，每次比较时计数"""
+    __slots__ = ("key", "counter")
+
+    def __init__(self, key, counter: "ComparisonCounter"):
+        self.key = key
+        self.counter = counter
+
+    def __lt__(self, other):
+        self.counter.count += 1
+        return self.key < other.key
+
+    def __gt__(self, other):
+        self.counter.count += 1
+        return self.key > other.key
+
+    def __le__(self, other):
+        self.counter.count += 1
+        return self.key <= other.key
+
+    def __ge__(self, other):
+        self.counter.count += 1
+        return self.key >= other.key
+
+    def __eq__(self, other):
+        self.counter.count += 1
+        return self.key == other.key
+
+    def __hash__(self):
+        return hash(self.key)
+
+
+class ComparisonCounter(SortInstrument):
+    """统计比较次数：用计数对象包装排序键，只对基于比较的策略生效"""
+
+    def __init__(self):
+        self.count = 0
+        self._enabled = False
+
+    def prepare(self, strategy, data, key):
+        self.count = 0
+        self._enabled = strategy.comparison_based
+        if not self._enabled:
+            return data, key
+        if key is None:
+            return data, lambda x: _CountedKey(x, self)
+        return data, lambda x: _CountedKey(key(x), self)
+
+    def stop(self, stats):
+        stats.comparisons = self.count if self._enabled else None
+
+
+class _CountingList(list):
+    """统计元素写入次数的列表"""
+    __slots__ = ("counter",)
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            value = list(value)
+            self.counter.count += len(value)
+        else:
+            self.counter.count += 1
+        super().__setitem__(index, value)
+
+
+class MoveCounter(SortInstrument):
+    """统计对待排序列表的元素写入次数（返回新列表的策略只计入对输入的写入）"""
+
+    def __init__(self):
+        self.count = 0
+        self._enabled = False
+
+    def prepare(self, strategy, data, key):
+        self.count = 0
+        self._enabled = isinstance(data, list)
+        if not self._enabled:
+            return data, key
+        counted = _CountingList(data)
+        counted.counter = self
+        return counted, key
+
+    def stop(self, stats):
+        stats.moves = self.count if self._enabled else None
+
+
+class RecursionDepthTracker(SortInstrument):
+    """通过 sys.setprofile 记录任一函数的最大递归嵌套层数"""
+
+    def __init__(self):
+        self._depth = {}
+        self.max_depth = 0
+        self._previous = None
+
+    def _profile(self, frame, event, arg):
+        if event == "call":
+            code = frame.f_code
+            depth = self._depth.get(code, 0) + 1
+            self._depth[code] = depth
+            if depth > self.max_depth:
+                self.max_depth = depth
+        elif event == "return":
+            code = frame.f_code
+            if code in self._depth:
+                self._depth[code] -= 1
+
+    def start(self):
+        self._depth = {}
+        self.max_depth = 0
+        self._previous = sys.getprofile()
+        sys.setprofile(self._profile)
+
+    def stop(self, stats):
+        sys.setprofile(self._previous)
+        stats.max_depth = self.max_depth
+
+
+class AllocationTracker(SortInstrument):
+    """用 tracemalloc 记录排序期间新分配内存的峰值"""
+
+    def __init__(self):
+        self._owner = False
+        self._baseline = 0
+
+    def start(self):
+        self._owner = not tracemalloc.is_tracing()
+        if self._owner:
+            tracemalloc.start()
+        else:
+            tracemalloc.reset_peak()
+        self._baseline = tracemalloc.get_traced_memory()[0]
+
+    def stop(self, stats):
+        peak = tracemalloc.get_traced_memory()[1]
+        if self._owner:
+            tracemalloc.stop()
+        stats.peak_bytes = max(0, peak - self._baseline)
+
+
+class Timer(SortInstrument):
+    """记录排序耗时；与其他插桩同时启用时会包含它们在排序过程中的开销"""
+
+    def __init__(self):
+        self._start = 0.0
+
+    def start(self):
+        self._start = time.perf_counter()
+
+    def stop(self, stats):
+        stats.elapsed = time.perf_counter() - self._start
+
+
+def default_instruments() -> List[SortInstrument]:
+    """全部插桩（计时放在最后，最先结束）"""
+    return [ComparisonCounter(), MoveCounter(), RecursionDepthTracker(), AllocationTracker(), Timer()]
+
 
 # 上下文
 class Sorter:
@@ -76,16 +1170,145 @@ class Sorter:
 
     def __init__(self, strategy: SortStrategy = None):
         self._strategy = strategy or QuickSortStrategy()  # 默认使用快速排序
+        self._instruments: List[SortInstrument] = []  # 为空时不做任何统计
+        self.last_stats: Optional[SortStats] = None
 
     def set_strategy(self, strategy: SortStrategy):
         """设置排序策略"""
         self._strategy = strategy
 
-    def perform_sort(self, data: List) -> List:
-        """执行排序"""
-        if not data:
+    def enable_auto(self, strategy: AutoSortStrategy = None):
+        """启用自动模式：排序前对输入抽样，自动选择策略"""
+        self._strategy = strategy or AutoSortStrategy()
+
+    def enable_stats(self, *instruments: SortInstrument):
+        """
+        启用排序统计，结果在 perform_sort 之后通过 last_stats 获取
+        :param instruments: 要启用的插桩，默认全部
+        """
+        self._instruments = list(instruments) or default_instruments()
+
+    def disable_stats(self):
+        """关闭排序统计"""
+        self._instruments = []
+
+    def perform_sort(self, data: List, key: Callable = None, reverse: bool = False,
+                     stable: bool = False) -> List:
+        """
+        执行排序
+        :param key: 键函数，每个元素只计算一次
+        :param reverse: 是否降序
+        :param stable: 要求稳定排序，当前策略不稳定时抛出 ValueError
+        """
+        if stable and not self._strategy.is_stable:
+            raise ValueError(f"{self._strategy.__class__.__name__} is not a stable sort")
+        if len(data) == 0:
             return data
-        return self._strategy.sort(data.copy())
+        if self._instruments:
+            return self._instrumented_sort(data, key, reverse)
+        if self._strategy.accepts_buffers:
+            # 由策略自行决定是否复制（支持零拷贝的数组输入）
+            return self._strategy.sort(data, key=key, reverse=reverse)
+        return self._strategy.sort(data.copy(), key=key, reverse=reverse)
+
+    def top_k(self, data: List, k: int, key: Callable = None, largest: bool = False) -> List:
+        """
+        取最小（largest=True 时最大）的 k 个元素，按顺序返回
+        k 相对 n 较小时用大小为 k 的堆，O(n log k)；否则先内省选择再只排序这 k 个元素
+        """
+        n = len(data)
+        if k <= 0:
+            return []
+        if k >= n:
+            return self.perform_sort(list(data), key=key, reverse=largest)
+        if k <= n // 8:
+            return self.top_k_stream(data, k, key=key, largest=largest)
+
+        values = list(data)
+        keys = [key(x) for x in values] if key is not None else None
+        a, v = (values, None) if keys is None else (keys, values)
+        pivot = n - k if largest else k - 1
+        _introselect(a, pivot, v)
+        if largest:
+            chosen, chosen_keys = values[pivot:], (keys[pivot:] if keys is not None else None)
+        else:
+            chosen, chosen_keys = values[:k], (keys[:k] if keys is not None else None)
+        result = self._strategy._sort(chosen, chosen_keys)
+        if largest:
+            result.reverse()
+        return result
+
+    @staticmethod
+    def top_k_stream(iterable: Iterable, k: int, key: Callable = None, largest: bool = False) -> List:
+        """
+        流式取最小（largest=True 时最大）的 k 个元素：只遍历一次输入，内存 O(k)
+        适用于生成器、文件等无法随机访问或不宜整体载入内存的数据
+        """
+        if k <= 0:
+            return []
+        if largest:
+            return heapq.nlargest(k, iterable, key=key)
+        return heapq.nsmallest(k, iterable, key=key)
+
+    @staticmethod
+    def nth_element(data: List, n: int, key: Callable = None):
+        """
+        返回第 n 小（从 0 开始）的元素，期望 O(n)，不做完整排序
+        """
+        if not 0 <= n < len(data):
+            raise IndexError("nth_element index out of range")
+        values = list(data)
+        if key is None:
+            _introselect(values, n)
+            return values[n]
+        keys = [key(x) for x in values]
+        _introselect(keys, n, values)
+        return values[n]
+
+    def _instrumented_sort(self, data, key: Optional[Callable], reverse: bool):
+        """
+        启用统计时的排序路径
+        先用 resolve 在原始数据上确定实际执行的策略，再按该策略插桩并排序，
+        这样 AutoSortStrategy 的统计与不启用统计时执行的是同一个算法
+        """
+        strategy = self._strategy.resolve(data, key, reverse)
+        if strategy is self._strategy:
+            return self._measured_sort(strategy, data, key, reverse)
+        try:
+            return self._measured_sort(strategy, data, key, reverse)
+        except (TypeError, ValueError):
+            # 分派只是基于抽样的估计，与 AutoSortStrategy 自身的回退一致：交回分派策略处理
+            return self._measured_sort(self._strategy, data, key, reverse)
+
+    def _measured_sort(self, strategy: SortStrategy, data, key: Optional[Callable], reverse: bool):
+        if not strategy.accepts_buffers:
+            data = data.copy()
+        for instrument in self._instruments:
+            data, key = instrument.prepare(strategy, data, key)
+
+        stats = SortStats()
+        for instrument in self._instruments:
+            instrument.start()
+        try:
+            result = strategy.sort(data, key=key, reverse=reverse)
+        finally:
+            for instrument in reversed(self._instruments):
+                instrument.stop(stats)
+        self.last_stats = stats
+
+        if isinstance(result, _CountingList):
+            result = list(result)
+        return result
+
+    def perform_external_sort(self, source: Union[str, os.PathLike, Iterable], output_path: str = None,
+                              memory_limit: int = 64 << 20):
+        """
+        外部排序：数据大于内存时分段排序落盘再归并，每段使用当前策略排序
+        :param source: 可迭代的记录，或文本文件路径
+        :param output_path: 输出文件路径；为 None 时返回有序记录的迭代器
+        :param memory_limit: 内存预算（字节）
+        """
+        return ExternalSorter(self._strategy, memory_limit=memory_limit).sort(source, output_path)
 
 
 # 客户端代码
@@ -97,15 +1320,62 @@ def main():
 
     # 使用冒泡排序
     sorter.set_strategy(BubbleSortStrategy())
-    print("排序结果:", sorter.perform_sort(data))
+    print("冒泡排序结果:", sorter.perform_sort(data))
 
     # 使用归并排序
     sorter.set_strategy(MergeSortStrategy())
-    print("排序结果:", sorter.perform_sort(data))
+    print("归并排序结果:", sorter.perform_sort(data))
 
     # 使用快速排序
     sorter.set_strategy(QuickSortStrategy())
-    print("排序结果:", sorter.perform_sort(data))
+    print("快速排序结果:", sorter.perform_sort(data))
+
+    # 使用自适应排序
+    sorter.set_strategy(AdaptiveSortStrategy())
+    print("自适应排序结果:", sorter.perform_sort(data))
+
+    # 使用基数排序（支持负数）
+    sorter.set_strategy(RadixSortStrategy())
+    print("基数排序结果:", sorter.perform_sort([170, -45, 75, 90, -802, 24, 2, 66]))
+
+    # 使用桶排序
+    sorter.set_strategy(BucketSortStrategy())
+    print("桶排序结果:", sorter.perform_sort([0.42, 0.32, 0.23, 0.52, 0.25, 0.47, 0.51]))
+
+    # 使用 NumPy 向量化排序（零拷贝排序 array.array）
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        print("未安装 numpy，跳过 NumPy 排序演示")
+    else:
+        sorter.set_strategy(NumPySortStrategy(in_place=True))
+        floats = array.array("d", [0.42, 0.32, 0.23, 0.52, 0.25])
+        print("NumPy排序结果:", sorter.perform_sort(floats))
+
+    # 按键降序的稳定排序
+    records = [("bob", 3), ("amy", 1), ("cat", 3), ("dan", 2)]
+    sorter.set_strategy(MergeSortStrategy())
+    print("按键降序稳定排序结果:", sorter.perform_sort(records, key=lambda r: r[1], reverse=True, stable=True))
+
+    # 自动模式
+    auto = AutoSortStrategy()
+    sorter.enable_auto(auto)
+    print("自动模式结果:", sorter.perform_sort(data), "使用", auto.last_strategy.__class__.__name__)
+    print("自动模式结果:", sorter.perform_sort([i % 3 for i in range(100)]), "使用",
+          auto.last_strategy.__class__.__name__)
+
+    # 部分排序与选择
+    sorter.set_strategy(AdaptiveSortStrategy())
+    print("最小的3个:", sorter.top_k(data, 3))
+    print("最大的3个:", sorter.top_k(data, 3, largest=True))
+    print("中位数:", sorter.nth_element(data, len(data) // 2))
+    print("流式最大的2个:", sorter.top_k_stream(iter(data), 2, largest=True))
+
+    # 排序统计
+    sorter.set_strategy(AdaptiveSortStrategy())
+    sorter.enable_stats()
+    sorter.perform_sort(data)
+    print("排序统计:", sorter.last_stats)
 
 
 if __name__ == "__main__":
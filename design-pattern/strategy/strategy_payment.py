@@ -1,10 +1,26 @@
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
 from enum import Enum
-from typing import Dict, Type, Optional, Any
+from typing import Dict, Type, Optional, Any, Callable, Iterable, List, Tuple
+import ast
+import asyncio
+import heapq
+import math
 import inspect
+import importlib.metadata
+import importlib.util
 from importlib import import_module
+import os
+import queue
+import collections
+import collections.abc
+import itertools
+import json
+import random
+import sqlite3
 import threading
+import time
 
 
 # ==================== 基础模型定义 ====================
@@ -17,6 +33,10 @@ class PaymentType(Enum):
     BANK_TRANSFER = "bank_transfer"
     WECHAT_PAY = "wechat_pay"  # 扩展的新支付方式
 
+    def __init__(self, value):
+        # 定义顺序下标，工厂用它直接索引策略快照，避免每次查找都计算枚举哈希
+        self.ordinal = len(self.__class__.__members__)
+
 
 @dataclass
 class PaymentRequest:
@@ -58,6 +78,33 @@ class IPaymentStrategy(ABC):
         """
         pass
 
+    # 是否支持批量接口（一次往返提交多笔支付）
+    supports_batch = False
+
+    def process_batch(self, requests: List[PaymentRequest]) -> List[PaymentResult]:
+        """
+        批量处理支付请求，默认逐笔处理
+        支持批量接口的策略应重写此方法并将 supports_batch 置为 True
+        :param requests: 支付请求列表
+        :return: 与请求一一对应的支付结果列表
+        """
+        return [self.process_payment(request) for request in requests]
+
+    async def process_payment_async(self, request: PaymentRequest) -> PaymentResult:
+        """
+        异步处理支付请求
+        默认实现把同步的 process_payment 放到线程中执行（旧策略的同步转异步桥接），
+        支持异步 I/O 的策略应重写此方法，避免占用线程。
+        :param request: 支付请求对象
+        :return: 支付结果对象
+        """
+        return await asyncio.to_thread(self.process_payment, request)
+
+    @property
+    def is_native_async(self) -> bool:
+        """是否重写了 process_payment_async（原生异步实现）"""
+        return type(self).process_payment_async is not IPaymentStrategy.process_payment_async
+
     @property
     def strategy_name(self) -> str:
         """返回策略名称"""
@@ -74,10 +121,16 @@ class CreditCardStrategy(IPaymentStrategy):
         print(f"[CreditCard] Processing payment of {request.amount} {request.currency}")
 
         # 模拟网络请求延迟
-        import time
         start_time = time.time()
         time.sleep(0.5)
+        return self._result(request, start_time)
+
+    async def process_payment_async(self, request: PaymentRequest) -> PaymentResult:
+        start_time = time.time()
+        await asyncio.sleep(0.5)
+        return self._result(request, start_time)
 
+    def _result(self, request: PaymentRequest, start_time: float) -> PaymentResult:
         return PaymentResult(
             success=True,
             message="Credit card payment processed successfully",
@@ -93,10 +146,16 @@ class PayPalStrategy(IPaymentStrategy):
     def process_payment(self, request: PaymentRequest) -> PaymentResult:
         print(f"[PayPal] Processing payment of {request.amount} {request.currency}")
 
-        import time
         start_time = time.time()
         time.sleep(0.3)
+        return self._result(request, start_time)
+
+    async def process_payment_async(self, request: PaymentRequest) -> PaymentResult:
+        start_time = time.time()
+        await asyncio.sleep(0.3)
+        return self._result(request, start_time)
 
+    def _result(self, request: PaymentRequest, start_time: float) -> PaymentResult:
         return PaymentResult(
             success=True,
             message="PayPal payment processed successfully",
@@ -112,10 +171,16 @@ class CryptoStrategy(IPaymentStrategy):
     def process_payment(self, request: PaymentRequest) -> PaymentResult:
         print(f"[Crypto] Processing payment of {request.amount} {request.currency}")
 
-        import time
         start_time = time.time()
         time.sleep(1.0)  # 模拟区块链确认时间较长
+        return self._result(request, start_time)
 
+    async def process_payment_async(self, request: PaymentRequest) -> PaymentResult:
+        start_time = time.time()
+        await asyncio.sleep(1.0)
+        return self._result(request, start_time)
+
+    def _result(self, request: PaymentRequest, start_time: float) -> PaymentResult:
         return PaymentResult(
             success=True,
             message="Crypto payment processed (pending blockchain confirmation)",
@@ -128,13 +193,28 @@ class CryptoStrategy(IPaymentStrategy):
 class BankTransferStrategy(IPaymentStrategy):
     """银行转账策略"""
 
+    supports_batch = True  # 批量转账文件一次提交
+
     def process_payment(self, request: PaymentRequest) -> PaymentResult:
         print(f"[BankTransfer] Processing payment of {request.amount} {request.currency}")
 
-        import time
         start_time = time.time()
         time.sleep(0.8)
+        return self._result(request, start_time)
+
+    def process_batch(self, requests: List[PaymentRequest]) -> List[PaymentResult]:
+        print(f"[BankTransfer] Processing batch of {len(requests)} payments")
+
+        start_time = time.time()
+        time.sleep(0.8)  # 整批只需一次往返
+        return [self._result(request, start_time) for request in requests]
+
+    async def process_payment_async(self, request: PaymentRequest) -> PaymentResult:
+        start_time = time.time()
+        await asyncio.sleep(0.8)
+        return self._result(request, start_time)
 
+    def _result(self, request: PaymentRequest, start_time: float) -> PaymentResult:
         return PaymentResult(
             success=True,
             message="Bank transfer initiated",
@@ -152,10 +232,16 @@ class WeChatPayStrategy(IPaymentStrategy):
     def process_payment(self, request: PaymentRequest) -> PaymentResult:
         print(f"[WeChatPay] Processing payment of {request.amount} {request.currency}")
 
-        import time
         start_time = time.time()
         time.sleep(0.2)  # 微信支付通常较快
+        return self._result(request, start_time)
+
+    async def process_payment_async(self, request: PaymentRequest) -> PaymentResult:
+        start_time = time.time()
+        await asyncio.sleep(0.2)
+        return self._result(request, start_time)
 
+    def _result(self, request: PaymentRequest, start_time: float) -> PaymentResult:
         # 检查元数据中是否包含openid
         if request.metadata and 'wechat_openid' in request.metadata:
             openid = request.metadata['wechat_openid']
@@ -178,21 +264,49 @@ class WeChatPayStrategy(IPaymentStrategy):
 class RetryablePaymentStrategy(IPaymentStrategy):
     """可重试的支付策略装饰器"""
 
-    def __init__(self, wrapped_strategy: IPaymentStrategy, max_retries: int = 3):
+    def __init__(self, wrapped_strategy: IPaymentStrategy, max_retries: int = 3,
+                 on_retry: Callable[[str], None] = None):
+        """
+        :param wrapped_strategy: 被包装的策略
+        :param max_retries: 最多尝试次数
+        :param on_retry: 每次重试前以策略名称回调（用于指标统计）
+        """
         self._wrapped = wrapped_strategy
         self._max_retries = max_retries
+        self._on_retry = on_retry
 
     def process_payment(self, request: PaymentRequest) -> PaymentResult:
         last_error = None
         for attempt in range(1, self._max_retries + 1):
             print(f"Attempt {attempt} of {self._max_retries} with {self._wrapped.strategy_name}")
+            if attempt > 1 and self._on_retry is not None:
+                self._on_retry(self._wrapped.strategy_name)
             result = self._wrapped.process_payment(request)
             if result.success:
                 return result
             last_error = result.message
-            # 模拟指数退避
-            import time
-            time.sleep(2 ** attempt)
+            # 模拟指数退避（最后一次失败后不再等待）
+            if attempt < self._max_retries:
+                time.sleep(2 ** attempt)
+
+        return PaymentResult(
+            success=False,
+            message=f"Failed after {self._max_retries} attempts. Last error: {last_error}",
+            processing_time=0
+        )
+
+    async def process_payment_async(self, request: PaymentRequest) -> PaymentResult:
+        last_error = None
+        for attempt in range(1, self._max_retries + 1):
+            if attempt > 1 and self._on_retry is not None:
+                self._on_retry(self._wrapped.strategy_name)
+            result = await self._wrapped.process_payment_async(request)
+            if result.success:
+                return result
+            last_error = result.message
+            # 退避期间让出事件循环（最后一次失败后不再等待）
+            if attempt < self._max_retries:
+                await asyncio.sleep(2 ** attempt)
 
         return PaymentResult(
             success=False,
@@ -201,6 +315,814 @@ class RetryablePaymentStrategy(IPaymentStrategy):
         )
 
 
+# ==================== 非阻塞重试调度 ====================
+
+class RetryBudget:
+    """
+    全局重试预算（令牌桶）
+    每个新请求存入 ratio 个令牌，每秒另外补充 min_retries_per_second 个，每次重试消耗一个；
+    令牌耗尽时放弃重试，避免故障期间重试把流量放大。
+    """
+
+    def __init__(self, ratio: float = 0.2, min_retries_per_second: float = 10.0, max_tokens: float = 100.0):
+        self._ratio = ratio
+        self._refill_rate = min_retries_per_second
+        self._max_tokens = max_tokens
+        self._tokens = max_tokens
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self._max_tokens, self._tokens + (now - self._updated) * self._refill_rate)
+        self._updated = now
+
+    def deposit(self):
+        """记录一个新请求"""
+        with self._lock:
+            self._refill()
+            self._tokens = min(self._max_tokens, self._tokens + self._ratio)
+
+    def try_withdraw(self) -> bool:
+        """申请一次重试，预算不足时返回 False"""
+        with self._lock:
+            self._refill()
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+
+@dataclass(order=True)
+class _RetryTask:
+    """等待重试的支付任务，按到期时间排序"""
+    due: float
+    seq: int
+    strategy: IPaymentStrategy = field(compare=False)
+    request: PaymentRequest = field(compare=False)
+    future: Future = field(compare=False)
+    max_attempts: int = field(compare=False)
+    deadline: float = field(compare=False)
+    attempt: int = field(default=1, compare=False)
+    last_error: Optional[str] = field(default=None, compare=False)
+    on_retry: Optional[Callable[[str], None]] = field(default=None, compare=False)
+
+
+class RetryScheduler:
+    """
+    非阻塞重试调度器
+    每次尝试在线程池中执行；失败的请求按指数退避加随机抖动计算下次执行时间，
+    放入最小堆后立即释放工作线程，由调度线程在到期时重新派发。
+    受全局重试预算和单个请求的截止时间约束。
+    """
+
+    def __init__(self, base_delay: float = 2.0, max_delay: float = 30.0, deadline: float = 60.0,
+                 budget: RetryBudget = None, workers: int = 8):
+        """
+        :param base_delay: 第一次重试的退避上限（秒），之后每次翻倍
+        :param max_delay: 单次退避的最大值（秒）
+        :param deadline: 默认的请求截止时间（秒，从提交时算起）
+        :param budget: 全局重试预算，默认 RetryBudget()
+        :param workers: 执行支付的线程数
+        """
+        self._base_delay = base_delay
+        self._max_delay = max_delay
+        self._deadline = deadline
+        self._budget = budget or RetryBudget()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="payment-retry")
+        self._heap: List[_RetryTask] = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="retry-scheduler", daemon=True)
+        self._thread.start()
+
+    def submit(self, strategy: IPaymentStrategy, request: PaymentRequest, max_attempts: int = 3,
+               deadline: float = None, on_retry: Callable[[str], None] = None,
+               failed: PaymentResult = None) -> Future:
+        """
+        提交支付请求，立即返回 Future
+        :param max_attempts: 最多尝试次数（含第一次）
+        :param deadline: 截止时间（秒），超过后不再重试
+        :param on_retry: 每次安排重试时以策略名称回调（用于指标统计）
+        :param failed: 调用方已经尝试过一次的失败结果（如批量接口返回的），提供时不再立即执行，直接安排重试
+        """
+        future = Future()
+        task = _RetryTask(
+            due=0.0,
+            seq=next(self._seq),
+            strategy=strategy,
+            request=request,
+            future=future,
+            max_attempts=max_attempts,
+            deadline=time.monotonic() + (deadline if deadline is not None else self._deadline),
+            on_retry=on_retry,
+        )
+        if failed is not None:
+            task.last_error = failed.message
+            self._budget.deposit()
+            self._park(task)
+            return future
+        # 在锁内检查并派发：shutdown 先在锁内置 _closed 再关闭线程池，这里不会提交到已关闭的线程池
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("RetryScheduler is shut down")
+            self._executor.submit(self._attempt, task)
+        self._budget.deposit()
+        return future
+
+    def _attempt(self, task: _RetryTask):
+        if task.future.cancelled():
+            return
+        try:
+            result = task.strategy.process_payment(task.request)
+        except Exception as e:
+            result = PaymentResult(success=False, message=f"Payment processing failed: {str(e)}",
+                                   processing_time=0)
+        if result.success:
+            self._resolve(task, result)
+            return
+        task.last_error = result.message
+        self._park(task)
+
+    def _park(self, task: _RetryTask):
+        """计算下次重试时间并放入堆中；不满足重试条件时直接给出失败结果"""
+        if task.attempt >= task.max_attempts:
+            self._fail(task, f"Failed after {task.attempt} attempts")
+            return
+        # 指数退避 + 全抖动
+        backoff = min(self._max_delay, self._base_delay * 2 ** (task.attempt - 1))
+        due = time.monotonic() + random.uniform(0, backoff)
+        if due > task.deadline:
+            self._fail(task, f"Deadline exceeded after {task.attempt} attempts")
+            return
+        if not self._budget.try_withdraw():
+            self._fail(task, f"Retry budget exhausted after {task.attempt} attempts")
+            return
+
+        with self._cond:
+            # shutdown 之后才失败的尝试不能再入堆，调度线程已退出，没有人会取出它
+            closed = self._closed
+            if not closed:
+                task.attempt += 1
+                task.due = due
+                task.seq = next(self._seq)
+                heapq.heappush(self._heap, task)
+                self._cond.notify()
+        if closed:
+            self._fail(task, "Retry scheduler shut down")
+        elif task.on_retry is not None:
+            task.on_retry(task.strategy.strategy_name)
+
+    def _run(self):
+        """调度线程：等待堆顶任务到期后重新派发"""
+        while True:
+            with self._cond:
+                while not self._closed:
+                    now = time.monotonic()
+                    if self._heap and self._heap[0].due <= now:
+                        break
+                    self._cond.wait(self._heap[0].due - now if self._heap else None)
+                if self._closed:
+                    return
+                while self._heap and self._heap[0].due <= now:
+                    self._executor.submit(self._attempt, heapq.heappop(self._heap))
+
+    @staticmethod
+    def _resolve(task: _RetryTask, result: PaymentResult):
+        if not task.future.done():
+            task.future.set_result(result)
+
+    def _fail(self, task: _RetryTask, reason: str):
+        self._resolve(task, PaymentResult(
+            success=False,
+            message=f"{reason}. Last error: {task.last_error}",
+            processing_time=0
+        ))
+
+    def pending(self) -> int:
+        """等待重试的任务数"""
+        with self._cond:
+            return len(self._heap)
+
+    def shutdown(self, wait: bool = True):
+        """停止调度，等待中的任务以失败结束"""
+        with self._cond:
+            self._closed = True
+            parked, self._heap = self._heap, []
+            self._cond.notify_all()
+        for task in parked:
+            self._fail(task, "Retry scheduler shut down")
+        self._thread.join()
+        self._executor.shutdown(wait=wait)
+
+
+# ==================== 熔断与自适应限流 ====================
+
+class CircuitState(Enum):
+    """熔断器状态"""
+    CLOSED = "closed"  # 正常放行
+    OPEN = "open"  # 快速失败
+    HALF_OPEN = "half_open"  # 放行少量探测请求
+
+
+@dataclass(frozen=True)
+class CircuitPermit:
+    """熔断器放行凭证；probe 为 True 表示第 generation 次半开时放行的探测请求"""
+    probe: bool
+    generation: int
+
+
+class CircuitBreaker:
+    """
+    熔断器
+    在最近 window 次调用中，错误率超过 failure_rate，或延迟的 p99 超过 latency_p99_ms 时打开；
+    打开 open_seconds 秒后进入半开状态，放行 half_open_probes 个探测请求，
+    全部成功则关闭，任一失败则重新打开。
+    只有本次半开放行的探测请求才计入探测结果：关闭状态下放行、半开后才完成的慢请求会被忽略。
+    """
+
+    def __init__(self, window: int = 100, min_requests: int = 20, failure_rate: float = 0.5,
+                 latency_p99_ms: float = None, open_seconds: float = 30.0, half_open_probes: int = 3):
+        self._outcomes = collections.deque(maxlen=window)  # (是否成功, 延迟毫秒)
+        self._min_requests = min_requests
+        self._failure_rate = failure_rate
+        self._latency_p99_ms = latency_p99_ms
+        self._open_seconds = open_seconds
+        self._half_open_probes = half_open_probes
+        self._state = CircuitState.CLOSED
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        self._generation = 0  # 每次进入半开状态加一，用于识别本轮的探测请求
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> CircuitState:
+        with self._lock:
+            self._maybe_half_open()
+            return self._state
+
+    def _maybe_half_open(self):
+        if self._state is CircuitState.OPEN and time.monotonic() - self._opened_at >= self._open_seconds:
+            self._state = CircuitState.HALF_OPEN
+            self._probes_in_flight = 0
+            self._probe_successes = 0
+            self._generation += 1
+
+    def _is_current_probe(self, permit: Optional[CircuitPermit]) -> bool:
+        return (permit is not None and permit.probe and permit.generation == self._generation
+                and self._state is CircuitState.HALF_OPEN)
+
+    def allow_request(self) -> Optional[CircuitPermit]:
+        """是否放行本次请求；放行时返回凭证，之后必须用该凭证调用 record 或 cancel，拒绝时返回 None"""
+        with self._lock:
+            self._maybe_half_open()
+            if self._state is CircuitState.CLOSED:
+                return CircuitPermit(probe=False, generation=self._generation)
+            if self._state is CircuitState.HALF_OPEN and \
+                    self._probes_in_flight + self._probe_successes < self._half_open_probes:
+                self._probes_in_flight += 1
+                return CircuitPermit(probe=True, generation=self._generation)
+            return None
+
+    def cancel(self, permit: CircuitPermit = None):
+        """放行后未实际调用（例如被限流拒绝）"""
+        with self._lock:
+            if self._is_current_probe(permit):
+                self._probes_in_flight -= 1
+
+    def record(self, success: bool, latency_ms: float, permit: CircuitPermit = None):
+        """记录一次调用结果"""
+        self.record_many([success], latency_ms, permit)
+
+    def record_many(self, successes: List[bool], latency_ms: float, permit: CircuitPermit = None):
+        """
+        记录一次批量调用的结果（一个凭证对应整批请求）
+        探测凭证只计一次探测，整批都成功才算成功；普通凭证每个请求各计一次
+        """
+        with self._lock:
+            if self._is_current_probe(permit):
+                self._probes_in_flight -= 1
+                if not all(successes):
+                    self._trip()
+                    return
+                self._probe_successes += 1
+                if self._probe_successes >= self._half_open_probes:
+                    self._state = CircuitState.CLOSED
+                    self._outcomes.clear()
+                return
+            if self._state is not CircuitState.CLOSED:
+                # 打开状态，或半开状态下关闭时放行的旧请求：不计入
+                return
+
+            for success in successes:
+                self._outcomes.append((success, latency_ms))
+            if len(self._outcomes) < self._min_requests:
+                return
+            failures = sum(1 for ok, _ in self._outcomes if not ok)
+            if failures / len(self._outcomes) >= self._failure_rate:
+                self._trip()
+            elif self._latency_p99_ms is not None and self._p99() > self._latency_p99_ms:
+                self._trip()
+
+    def _p99(self) -> float:
+        latencies = sorted(latency for _, latency in self._outcomes)
+        return latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+
+    def _trip(self):
+        self._state = CircuitState.OPEN
+        self._opened_at = time.monotonic()
+        self._outcomes.clear()
+
+
+class AIMDConcurrencyLimiter:
+    """
+    AIMD 自适应并发限制
+    成功且延迟不超过目标时并发上限加性增长（每个上限周期 +1），
+    失败或延迟超标时乘性下降；在途请求达到上限时直接拒绝。
+    """
+
+    def __init__(self, initial_limit: float = 10, min_limit: int = 1, max_limit: int = 200,
+                 latency_target_ms: float = None, backoff: float = 0.9):
+        self._limit = float(initial_limit)
+        self._min_limit = min_limit
+        self._max_limit = max_limit
+        self._latency_target_ms = latency_target_ms
+        self._backoff = backoff
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    def try_acquire(self) -> bool:
+        with self._lock:
+            if self._in_flight >= int(self._limit):
+                return False
+            self._in_flight += 1
+            return True
+
+    def release(self, success: bool, latency_ms: float):
+        with self._lock:
+            self._in_flight -= 1
+            overloaded = self._latency_target_ms is not None and latency_ms > self._latency_target_ms
+            if not success or overloaded:
+                self._limit = max(self._min_limit, self._limit * self._backoff)
+            else:
+                self._limit = min(self._max_limit, self._limit + 1 / self._limit)
+
+
+class GuardedPaymentStrategy(IPaymentStrategy):
+    """
+    熔断 + 自适应限流的支付策略装饰器
+    熔断打开或并发已满时快速失败，配置了备用策略时改由备用策略处理
+    """
+
+    def __init__(self, wrapped_strategy: IPaymentStrategy, breaker: CircuitBreaker,
+                 limiter: AIMDConcurrencyLimiter = None, fallback: IPaymentStrategy = None):
+        self._wrapped = wrapped_strategy
+        self._breaker = breaker
+        self._limiter = limiter
+        self._fallback = fallback
+
+    @property
+    def strategy_name(self) -> str:
+        return self._wrapped.strategy_name
+
+    @property
+    def supports_batch(self) -> bool:
+        return self._wrapped.supports_batch
+
+    def _acquire(self) -> Tuple[Optional[CircuitPermit], Optional[str]]:
+        """申请熔断器与限流器的放行凭证，返回 (凭证, 拒绝原因)"""
+        permit = self._breaker.allow_request()
+        if permit is None:
+            return None, f"Circuit open for {self._wrapped.strategy_name}"
+        if self._limiter is not None and not self._limiter.try_acquire():
+            self._breaker.cancel(permit)
+            return None, f"Concurrency limit reached for {self._wrapped.strategy_name}"
+        return permit, None
+
+    def _release(self, permit: CircuitPermit, successes: List[bool], start: float):
+        latency_ms = (time.monotonic() - start) * 1000
+        self._breaker.record_many(successes, latency_ms, permit)
+        if self._limiter is not None:
+            self._limiter.release(all(successes), latency_ms)
+
+    def process_payment(self, request: PaymentRequest) -> PaymentResult:
+        permit, reason = self._acquire()
+        if permit is None:
+            return self._reject(request, reason)
+
+        start = time.monotonic()
+        success = False
+        try:
+            result = self._wrapped.process_payment(request)
+            success = result.success
+            return result
+        finally:
+            self._release(permit, [success], start)
+
+    def process_batch(self, requests: List[PaymentRequest]) -> List[PaymentResult]:
+        """整批只申请一次放行凭证，按请求逐个记录结果；被拒绝时整批交给备用策略"""
+        permit, reason = self._acquire()
+        if permit is None:
+            if self._fallback is not None:
+                return self._fallback.process_batch(requests)
+            return [PaymentResult(success=False, message=reason, processing_time=0) for _ in requests]
+
+        start = time.monotonic()
+        successes = [False] * len(requests)
+        try:
+            results = self._wrapped.process_batch(requests)
+            successes = [result.success for result in results]
+            return results
+        finally:
+            self._release(permit, successes, start)
+
+    def _reject(self, request: PaymentRequest, reason: str) -> PaymentResult:
+        if self._fallback is not None:
+            return self._fallback.process_payment(request)
+        return PaymentResult(success=False, message=reason, processing_time=0)
+
+
+# ==================== 幂等缓存 ====================
+
+def _chain_future(source: Future) -> Future:
+    """返回一个跟随 source 完成的新 Future；取消新 Future 不会影响 source"""
+    future = Future()
+
+    def copy(f: Future):
+        if future.done():
+            return
+        if f.cancelled():
+            future.cancel()
+        elif f.exception() is not None:
+            future.set_exception(f.exception())
+        else:
+            future.set_result(f.result())
+
+    source.add_done_callback(copy)
+    return future
+
+
+class IdempotencyCache:
+    """
+    以 PaymentRequest.reference 为键的幂等缓存
+    - 成功的支付结果按 TTL 缓存，超过 max_entries 时淘汰最久未使用的条目（LRU）；
+    - 同一 reference 的并发请求合并为一次执行（single-flight），其余请求等待并共享结果；
+    - 可选地持久化到本地 SQLite 文件，进程重启后仍然有效。
+    失败的结果不缓存，客户端可以用同一 reference 重新发起支付。
+    """
+
+    def __init__(self, ttl: float = 24 * 3600, max_entries: int = 10000, db_path: str = None):
+        """
+        :param ttl: 缓存有效期（秒）
+        :param max_entries: 内存中最多保留的条目数
+        :param db_path: SQLite 文件路径，为 None 时只缓存在内存中
+        """
+        self._ttl = ttl
+        self._max_entries = max_entries
+        self._entries: "collections.OrderedDict[str, Tuple[float, PaymentResult]]" = collections.OrderedDict()
+        self._in_flight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._hits = self._misses = self._coalesced = 0
+        self._db = None
+        if db_path is not None:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS payment_results "
+                "(reference TEXT PRIMARY KEY, result TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._db.commit()
+
+    def get(self, reference: str) -> Optional[PaymentResult]:
+        """查询未过期的缓存结果"""
+        with self._lock:
+            return self._lookup(reference)
+
+    def get_or_process(self, reference: str, process) -> PaymentResult:
+        """
+        返回 reference 的缓存结果；没有缓存时调用 process() 处理，
+        同一 reference 的并发调用只会执行一次 process
+        """
+        cached, pending = self.begin(reference)
+        if cached is not None:
+            return cached
+        if pending is not None:
+            return pending.result()
+
+        try:
+            result = process()
+        except BaseException as e:
+            self.abort(reference, e)
+            raise
+        self.complete(reference, result)
+        return result
+
+    def begin(self, reference: str) -> Tuple[Optional[PaymentResult], Optional[Future]]:
+        """
+        开始处理 reference（供批量、异步提交等无法直接使用 get_or_process 的路径使用）
+        :return: 有缓存时为 (结果, None)；其他调用正在处理时为 (None, 该调用的 Future)；
+                 否则为 (None, None)，调用方负责处理，之后必须调用 complete 或 abort
+        """
+        with self._lock:
+            cached = self._lookup(reference)
+            if cached is not None:
+                self._hits += 1
+                return cached, None
+            future = self._in_flight.get(reference)
+            if future is not None:
+                self._coalesced += 1
+                return None, future
+            self._in_flight[reference] = Future()
+            self._misses += 1
+            return None, None
+
+    def complete(self, reference: str, result: PaymentResult):
+        """begin 之后处理完成：成功的结果写入缓存，并唤醒等待同一 reference 的调用"""
+        with self._lock:
+            if result.success:
+                self._store(reference, result)
+            future = self._in_flight.pop(reference, None)
+        if future is not None and not future.done():
+            future.set_result(result)
+
+    def abort(self, reference: str, error: BaseException):
+        """begin 之后处理出错：等待同一 reference 的调用收到同样的异常"""
+        with self._lock:
+            future = self._in_flight.pop(reference, None)
+        if future is not None and not future.done():
+            future.set_exception(error)
+
+    def _lookup(self, reference: str) -> Optional[PaymentResult]:
+        now = time.time()
+        entry = self._entries.get(reference)
+        if entry is not None:
+            expires_at, result = entry
+            if expires_at > now:
+                self._entries.move_to_end(reference)
+                return result
+            del self._entries[reference]
+
+        if self._db is not None:
+            row = self._db.execute(
+                "SELECT result, expires_at FROM payment_results WHERE reference = ?", (reference,)
+            ).fetchone()
+            if row is not None:
+                if row[1] > now:
+                    result = PaymentResult(**json.loads(row[0]))
+                    self._remember(reference, row[1], result)
+                    return result
+                self._db.execute("DELETE FROM payment_results WHERE reference = ?", (reference,))
+                self._db.commit()
+        return None
+
+    def _remember(self, reference: str, expires_at: float, result: PaymentResult):
+        self._entries[reference] = (expires_at, result)
+        self._entries.move_to_end(reference)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    def _store(self, reference: str, result: PaymentResult):
+        expires_at = time.time() + self._ttl
+        self._remember(reference, expires_at, result)
+        if self._db is not None:
+            self._db.execute(
+                "INSERT OR REPLACE INTO payment_results (reference, result, expires_at) VALUES (?, ?, ?)",
+                (reference, json.dumps(asdict(result)), expires_at)
+            )
+            self._db.commit()
+
+    def purge_expired(self):
+        """清理过期条目"""
+        now = time.time()
+        with self._lock:
+            for reference in [k for k, (expires_at, _) in self._entries.items() if expires_at <= now]:
+                del self._entries[reference]
+            if self._db is not None:
+                self._db.execute("DELETE FROM payment_results WHERE expires_at <= ?", (now,))
+                self._db.commit()
+
+    def stats(self) -> Dict[str, int]:
+        """命中、未命中与合并的请求数"""
+        with self._lock:
+            return {"hits": self._hits, "misses": self._misses, "coalesced": self._coalesced,
+                    "entries": len(self._entries)}
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+
+# ==================== 指标 ====================
+
+class LatencyHistogram:
+    """
+    对数分桶的延迟直方图（HDR 风格）
+    每个 2 的幂区间再细分为 SUB_BUCKETS 个桶，相对误差约 2^(1/SUB_BUCKETS) - 1（约 19%）
+    """
+
+    SUB_BUCKETS = 4
+    MIN_MS = 0.001
+
+    @classmethod
+    def bucket_of(cls, latency_ms: float) -> int:
+        return math.ceil(math.log2(max(latency_ms, cls.MIN_MS)) * cls.SUB_BUCKETS)
+
+    @classmethod
+    def upper_bound(cls, bucket: int) -> float:
+        return 2 ** (bucket / cls.SUB_BUCKETS)
+
+    @classmethod
+    def percentile(cls, buckets: Dict[int, int], q: float) -> Optional[float]:
+        """按桶上界估计分位数"""
+        total = sum(buckets.values())
+        if total == 0:
+            return None
+        rank = q * total
+        seen = 0
+        for bucket in sorted(buckets):
+            seen += buckets[bucket]
+            if seen >= rank:
+                return cls.upper_bound(bucket)
+        return cls.upper_bound(max(buckets))
+
+
+class _MetricsShard:
+    """单个线程的指标分片，只由所属线程写入，无需加锁"""
+
+    def __init__(self):
+        self.outcomes: Dict[Tuple[str, bool], int] = collections.defaultdict(int)
+        self.retries: Dict[str, int] = collections.defaultdict(int)
+        self.fees: Dict[str, float] = collections.defaultdict(float)
+        self.in_flight: Dict[str, int] = collections.defaultdict(int)
+        self.latency: Dict[str, Dict[int, int]] = collections.defaultdict(lambda: collections.defaultdict(int))
+        self.latency_sum: Dict[str, float] = collections.defaultdict(float)
+
+
+class PaymentMetrics:
+    """
+    支付指标注册表
+    按策略统计：成功/失败/重试次数、手续费合计、在途请求数、延迟直方图。
+    每个线程写入自己的分片，记录路径不加锁；导出时合并所有分片（快照为近似一致）。
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._shards: List[_MetricsShard] = []
+        self._shards_lock = threading.Lock()  # 只在线程第一次记录时使用
+
+    def _shard(self) -> _MetricsShard:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = _MetricsShard()
+            with self._shards_lock:
+                self._shards.append(shard)
+        return shard
+
+    def start_request(self, strategy_name: str):
+        self._shard().in_flight[strategy_name] += 1
+
+    def finish_request(self, strategy_name: str, result: Optional[PaymentResult], latency_ms: float):
+        """记录一次调用，result 为 None 表示抛出异常"""
+        shard = self._shard()
+        shard.in_flight[strategy_name] -= 1
+        success = result is not None and result.success
+        shard.outcomes[(strategy_name, success)] += 1
+        if success and result.fee:
+            shard.fees[strategy_name] += result.fee
+        shard.latency[strategy_name][LatencyHistogram.bucket_of(latency_ms)] += 1
+        shard.latency_sum[strategy_name] += latency_ms
+
+    def record_retry(self, strategy_name: str):
+        self._shard().retries[strategy_name] += 1
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """合并所有分片，返回 {策略名称: 指标}"""
+        with self._shards_lock:
+            shards = list(self._shards)
+        merged: Dict[str, Dict[str, Any]] = collections.defaultdict(lambda: {
+            "success": 0, "failure": 0, "retries": 0, "fees": 0.0, "in_flight": 0,
+            "latency_buckets": collections.defaultdict(int), "latency_sum_ms": 0.0,
+        })
+        for shard in shards:
+            for (name, success), count in list(shard.outcomes.items()):
+                merged[name]["success" if success else "failure"] += count
+            for name, count in list(shard.retries.items()):
+                merged[name]["retries"] += count
+            for name, fee in list(shard.fees.items()):
+                merged[name]["fees"] += fee
+            for name, count in list(shard.in_flight.items()):
+                merged[name]["in_flight"] += count
+            for name, buckets in list(shard.latency.items()):
+                for bucket, count in list(buckets.items()):
+                    merged[name]["latency_buckets"][bucket] += count
+            for name, total in list(shard.latency_sum.items()):
+                merged[name]["latency_sum_ms"] += total
+        return merged
+
+    def to_json(self) -> str:
+        """导出 JSON：计数、手续费、在途请求数与延迟分位数"""
+        report = {}
+        for name, m in sorted(self.snapshot().items()):
+            buckets = m["latency_buckets"]
+            report[name] = {
+                "success": m["success"],
+                "failure": m["failure"],
+                "retries": m["retries"],
+                "fees": round(m["fees"], 6),
+                "in_flight": m["in_flight"],
+                "latency_ms": {
+                    "count": sum(buckets.values()),
+                    "sum": round(m["latency_sum_ms"], 3),
+                    "p50": LatencyHistogram.percentile(buckets, 0.50),
+                    "p90": LatencyHistogram.percentile(buckets, 0.90),
+                    "p99": LatencyHistogram.percentile(buckets, 0.99),
+                },
+            }
+        return json.dumps(report, indent=2)
+
+    def to_prometheus(self) -> str:
+        """导出 Prometheus 文本格式"""
+        snapshot = sorted(self.snapshot().items())
+        lines = [
+            "# HELP payment_requests_total Payment attempts by strategy and outcome.",
+            "# TYPE payment_requests_total counter",
+        ]
+        for name, m in snapshot:
+            lines.append(f'payment_requests_total{{strategy="{name}",outcome="success"}} {m["success"]}')
+            lines.append(f'payment_requests_total{{strategy="{name}",outcome="failure"}} {m["failure"]}')
+        lines += ["# HELP payment_retries_total Retries scheduled by strategy.",
+                  "# TYPE payment_retries_total counter"]
+        lines += [f'payment_retries_total{{strategy="{name}"}} {m["retries"]}' for name, m in snapshot]
+        lines += ["# HELP payment_fees_total Fees of successful payments.",
+                  "# TYPE payment_fees_total counter"]
+        lines += [f'payment_fees_total{{strategy="{name}"}} {m["fees"]}' for name, m in snapshot]
+        lines += ["# HELP payment_in_flight Payments currently being processed.",
+                  "# TYPE payment_in_flight gauge"]
+        lines += [f'payment_in_flight{{strategy="{name}"}} {m["in_flight"]}' for name, m in snapshot]
+        lines += ["# HELP payment_latency_ms Payment latency in milliseconds.",
+                  "# TYPE payment_latency_ms histogram"]
+        for name, m in snapshot:
+            buckets = m["latency_buckets"]
+            cumulative = 0
+            for bucket in sorted(buckets):
+                cumulative += buckets[bucket]
+                le = LatencyHistogram.upper_bound(bucket)
+                lines.append(f'payment_latency_ms_bucket{{strategy="{name}",le="{le:.6g}"}} {cumulative}')
+            lines.append(f'payment_latency_ms_bucket{{strategy="{name}",le="+Inf"}} {cumulative}')
+            lines.append(f'payment_latency_ms_sum{{strategy="{name}"}} {m["latency_sum_ms"]}')
+            lines.append(f'payment_latency_ms_count{{strategy="{name}"}} {cumulative}')
+        return "\n".join(lines) + "\n"
+
+
+class InstrumentedPaymentStrategy(IPaymentStrategy):
+    """记录指标的支付策略装饰器"""
+
+    def __init__(self, wrapped_strategy: IPaymentStrategy, metrics: PaymentMetrics):
+        self._wrapped = wrapped_strategy
+        self._metrics = metrics
+
+    @property
+    def strategy_name(self) -> str:
+        return self._wrapped.strategy_name
+
+    def process_payment(self, request: PaymentRequest) -> PaymentResult:
+        name = self._wrapped.strategy_name
+        self._metrics.start_request(name)
+        start = time.perf_counter()
+        result = None
+        try:
+            result = self._wrapped.process_payment(request)
+            return result
+        finally:
+            self._metrics.finish_request(name, result, (time.perf_counter() - start) * 1000)
+
+    @property
+    def supports_batch(self) -> bool:
+        return self._wrapped.supports_batch
+
+    def process_batch(self, requests: List[PaymentRequest]) -> List[PaymentResult]:
+        """整批调用一次，每个请求各记录一次结果、延迟（整批耗时）和手续费"""
+        name = self._wrapped.strategy_name
+        for _ in requests:
+            self._metrics.start_request(name)
+        start = time.perf_counter()
+        results = None
+        try:
+            results = self._wrapped.process_batch(requests)
+            return results
+        finally:
+            latency_ms = (time.perf_counter() - start) * 1000
+            for i in range(len(requests)):
+                result = results[i] if results is not None and i < len(results) else None
+                self._metrics.finish_request(name, result, latency_ms)
+
+
 # ==================== 工厂模式实现 ====================
 
 class PaymentStrategyFactory:
@@ -223,27 +1145,46 @@ class PaymentStrategyFactory:
 
     def _initialize(self):
         """初始化工厂"""
-        self._strategies: Dict[str, IPaymentStrategy] = {}
+        # 写时复制：读路径只读取不可变快照（按 PaymentType.ordinal 索引的元组），不加锁；
+        # 注册时在 _write_lock 下构造新元组并整体替换引用，读者看到的总是完整的旧快照或新快照
+        self._write_lock = threading.Lock()
+        self._strategies: Tuple[Optional[IPaymentStrategy], ...] = (None,) * len(PaymentType)
+        self._providers: Tuple[Optional[Type[IPaymentStrategy]], ...] = (None,) * len(PaymentType)
         self._register_default_strategies()
 
     def _register_default_strategies(self):
-        """注册默认策略"""
-        self.register_strategy(PaymentType.CREDIT_CARD, CreditCardStrategy())
-        self.register_strategy(PaymentType.PAYPAL, PayPalStrategy())
-        self.register_strategy(PaymentType.CRYPTO, CryptoStrategy())
-        self.register_strategy(PaymentType.BANK_TRANSFER, BankTransferStrategy())
-
-    def register_strategy(self, payment_type: PaymentType, strategy: IPaymentStrategy):
+        """注册默认策略（延迟实例化，可调用 warm() 预先创建）"""
+        self.register_strategy(PaymentType.CREDIT_CARD, CreditCardStrategy)
+        self.register_strategy(PaymentType.PAYPAL, PayPalStrategy)
+        self.register_strategy(PaymentType.CRYPTO, CryptoStrategy)
+        self.register_strategy(PaymentType.BANK_TRANSFER, BankTransferStrategy)
+
+    @staticmethod
+    def _replace(snapshot: tuple, payment_type: PaymentType, value) -> tuple:
+        items = list(snapshot)
+        items[payment_type.ordinal] = value
+        return tuple(items)
+
+    def register_strategy(self, payment_type: PaymentType, strategy):
         """
         注册支付策略
         :param payment_type: 支付类型
-        :param strategy: 策略实例
+        :param strategy: 策略实例；或策略类、"模块:类名" 字符串（第一次使用时才导入并实例化）
         """
-        if not isinstance(strategy, IPaymentStrategy):
+        if isinstance(strategy, IPaymentStrategy):
+            name = strategy.strategy_name
+            with self._write_lock:
+                self._providers = self._replace(self._providers, payment_type, None)
+                self._strategies = self._replace(self._strategies, payment_type, strategy)
+        elif (inspect.isclass(strategy) and issubclass(strategy, IPaymentStrategy)) or \
+                (isinstance(strategy, str) and ":" in strategy):
+            name = self._provider_name(strategy)
+            with self._write_lock:
+                self._providers = self._replace(self._providers, payment_type, strategy)
+                self._strategies = self._replace(self._strategies, payment_type, None)
+        else:
             raise ValueError("Strategy must implement IPaymentStrategy")
-
-        self._strategies[payment_type.value] = strategy
-        print(f"Registered strategy for {payment_type.value}: {strategy.strategy_name}")
+        print(f"Registered strategy for {payment_type.value}: {name}")
 
     def get_strategy(self, payment_type: PaymentType) -> IPaymentStrategy:
         """
@@ -251,38 +1192,168 @@ class PaymentStrategyFactory:
         :param payment_type: 支付类型
         :return: 支付策略实例
         """
-        strategy = self._strategies.get(payment_type.value)
+        strategy = self._strategies[payment_type.ordinal]
         if strategy is None:
-            raise ValueError(f"No strategy registered for {payment_type.value}")
+            strategy = self._instantiate(payment_type)
         return strategy
 
+    def _instantiate(self, payment_type: PaymentType) -> IPaymentStrategy:
+        """实例化延迟注册的策略并写入快照"""
+        with self._write_lock:
+            strategy = self._strategies[payment_type.ordinal]
+            if strategy is not None:  # 其他线程已经完成实例化
+                return strategy
+            provider = self._providers[payment_type.ordinal]
+            if provider is None:
+                raise ValueError(f"No strategy registered for {payment_type.value}")
+            if isinstance(provider, str):
+                provider = self._load_class(provider)
+            strategy = provider()
+            self._strategies = self._replace(self._strategies, payment_type, strategy)
+            return strategy
+
+    def warm(self) -> "PaymentStrategyFactory":
+        """预先实例化所有延迟注册的策略，避免第一笔支付承担初始化开销"""
+        for payment_type in PaymentType:
+            if self._providers[payment_type.ordinal] is not None:
+                self.get_strategy(payment_type)
+        return self
+
     def get_all_strategies(self) -> Dict[str, str]:
         """获取所有已注册策略信息"""
-        return {k: v.strategy_name for k, v in self._strategies.items()}
+        strategies, providers = self._strategies, self._providers
+        result = {}
+        for payment_type in PaymentType:
+            strategy = strategies[payment_type.ordinal]
+            provider = providers[payment_type.ordinal]
+            if strategy is not None:
+                result[payment_type.value] = strategy.strategy_name
+            elif provider is not None:
+                result[payment_type.value] = self._provider_name(provider)
+        return result
+
+    @staticmethod
+    def _provider_name(provider) -> str:
+        return provider.rpartition(":")[2] if isinstance(provider, str) else provider.__name__
+
+    @staticmethod
+    def _load_class(spec: str) -> Type[IPaymentStrategy]:
+        """导入 "模块:类名" 指定的策略类"""
+        module_name, _, class_name = spec.partition(":")
+        cls = getattr(import_module(module_name), class_name, None)
+        if not (inspect.isclass(cls) and issubclass(cls, IPaymentStrategy)):
+            raise ValueError(f"{spec} is not an IPaymentStrategy")
+        return cls
+
+    # 发现结果的磁盘缓存，按模块源文件的路径、大小和修改时间失效
+    DISCOVERY_CACHE = os.path.join(os.path.expanduser("~"), ".cache", "payment_strategy_discovery.json")
 
     @classmethod
-    def auto_register_strategies(cls, module_name: str):
+    def auto_register_strategies(cls, module_name: str, cache_path: Optional[str] = DISCOVERY_CACHE):
         """
         自动发现并注册策略类
+        只解析模块源码（不导入），按类名登记，策略在第一次使用时才导入并实例化；
+        类体中的 `payment_type = PaymentType.X` 优先，否则按类名推断（WeChatPayStrategy -> WECHAT_PAY）
         :param module_name: 模块名（如'payment.strategies'）
+        :param cache_path: 发现结果缓存文件，None 表示不缓存
         """
         try:
-            module = import_module(module_name)
-            for name, obj in inspect.getmembers(module):
-                if (inspect.isclass(obj) and
-                        issubclass(obj, IPaymentStrategy) and
-                        obj != IPaymentStrategy):
-                    # 从类名推断支付类型
-                    type_name = name.replace("Strategy", "").upper()
-                    try:
-                        payment_type = PaymentType[type_name]
-                        factory = cls()
-                        factory.register_strategy(payment_type, obj())
-                        print(f"Auto-registered {name} for {payment_type.value}")
-                    except KeyError:
-                        continue
-        except ImportError:
+            discovered = cls._discover(module_name, cache_path)
+        except (ImportError, SyntaxError, OSError):
+            discovered = None
+        if discovered is None:
             print(f"Warning: Could not import module {module_name} for auto-registration")
+            return
+        factory = cls()
+        for type_value, spec in discovered.items():
+            factory.register_strategy(PaymentType(type_value), spec)
+            print(f"Auto-registered {spec} for {type_value}")
+
+    @classmethod
+    def register_manifest(cls, path: str):
+        """
+        按清单文件注册策略（延迟导入）
+        :param path: JSON 文件，格式为 {"wechat_pay": "payment.wechat:WeChatPayStrategy", ...}
+        """
+        with open(path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        factory = cls()
+        for type_value, spec in manifest.items():
+            factory.register_strategy(PaymentType(type_value), spec)
+
+    @classmethod
+    def register_entry_points(cls, group: str = "payment_strategies"):
+        """
+        按已安装包声明的入口点注册策略（延迟导入）
+        入口点名称为支付类型值，如 wechat_pay = payment.wechat:WeChatPayStrategy
+        """
+        entry_points = importlib.metadata.entry_points()
+        if hasattr(entry_points, "select"):
+            entry_points = entry_points.select(group=group)
+        else:  # Python 3.9 及以下返回 dict
+            entry_points = entry_points.get(group, [])
+        factory = cls()
+        for entry_point in entry_points:
+            factory.register_strategy(PaymentType(entry_point.name), entry_point.value)
+
+    @classmethod
+    def _discover(cls, module_name: str, cache_path: Optional[str]) -> Optional[Dict[str, str]]:
+        """返回 {支付类型值: "模块:类名"}，模块不存在或不是源码文件时返回 None"""
+        spec = importlib.util.find_spec(module_name)
+        if spec is None or not spec.origin or not spec.origin.endswith(".py"):
+            return None
+        stat = os.stat(spec.origin)
+        fingerprint = [spec.origin, stat.st_size, stat.st_mtime_ns]
+
+        cache = {}
+        if cache_path:
+            try:
+                with open(cache_path, "r", encoding="utf-8") as f:
+                    cache = json.load(f)
+            except (OSError, ValueError):
+                cache = {}
+            entry = cache.get(module_name)
+            if entry and entry.get("fingerprint") == fingerprint:
+                return entry["strategies"]
+
+        with open(spec.origin, "r", encoding="utf-8") as f:
+            tree = ast.parse(f.read(), spec.origin)
+        discovered = cls._scan_classes(module_name, tree)
+
+        if cache_path:
+            cache[module_name] = {"fingerprint": fingerprint, "strategies": discovered}
+            os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+            tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(cache, f)
+            os.replace(tmp_path, cache_path)  # 原子替换，并发写入时不会留下半个文件
+        return discovered
+
+    @staticmethod
+    def _scan_classes(module_name: str, tree: ast.Module) -> Dict[str, str]:
+        """在语法树中查找（直接或间接）继承 IPaymentStrategy 的类"""
+        by_name = {t.name.replace("_", ""): t for t in PaymentType}
+        strategy_classes = {"IPaymentStrategy"}
+        discovered = {}
+        for node in tree.body:
+            if not isinstance(node, ast.ClassDef):
+                continue
+            bases = {b.id if isinstance(b, ast.Name) else getattr(b, "attr", None) for b in node.bases}
+            if not bases & strategy_classes:
+                continue
+            strategy_classes.add(node.name)
+
+            payment_type = None
+            for stmt in node.body:
+                if (isinstance(stmt, ast.Assign) and len(stmt.targets) == 1
+                        and isinstance(stmt.targets[0], ast.Name) and stmt.targets[0].id == "payment_type"
+                        and isinstance(stmt.value, ast.Attribute) and stmt.value.attr in PaymentType.__members__):
+                    payment_type = PaymentType[stmt.value.attr]
+            if payment_type is None:
+                payment_type = by_name.get(node.name.replace("Strategy", "").upper())
+            if payment_type is not None:
+                discovered[payment_type.value] = f"{module_name}:{node.name}"
+        return discovered
 
 
 # ==================== 支付处理器 ====================
@@ -301,6 +1372,13 @@ class PaymentProcessor:
         self._factory = factory or PaymentStrategyFactory()
         self._enable_retry = False
         self._max_retries = 3
+        self._scheduler: Optional[RetryScheduler] = None
+        # 支付类型 -> (熔断器, 并发限制器, 备用支付类型)
+        self._guards: Dict[PaymentType, Tuple[CircuitBreaker, Optional[AIMDConcurrencyLimiter],
+                                              Optional[PaymentType]]] = {}
+        self._idempotency: Optional[IdempotencyCache] = None
+        self._metrics: Optional[PaymentMetrics] = None
+        self._ledger = None
 
     def enable_retry(self, max_retries: int = 3):
         """启用支付重试机制"""
@@ -311,6 +1389,168 @@ class PaymentProcessor:
         """禁用支付重试机制"""
         self._enable_retry = False
 
+    def enable_metrics(self, metrics: PaymentMetrics = None) -> PaymentMetrics:
+        """启用指标统计，返回指标注册表"""
+        self._metrics = metrics or PaymentMetrics()
+        return self._metrics
+
+    def disable_metrics(self):
+        """关闭指标统计"""
+        self._metrics = None
+
+    @property
+    def metrics(self) -> Optional[PaymentMetrics]:
+        return self._metrics
+
+    def enable_ledger(self, ledger):
+        """
+        启用支付流水记录：每笔支付完成后调用 ledger.record(策略名称, 请求, 结果)
+        :param ledger: 账本，如 payment_ledger.PaymentLedger；record 应只入队、不做 I/O
+        """
+        self._ledger = ledger
+
+    def disable_ledger(self):
+        """关闭支付流水记录（不关闭账本本身）"""
+        self._ledger = None
+
+    def _with_retry(self, strategy: IPaymentStrategy) -> IPaymentStrategy:
+        """启用重试时包装为 RetryablePaymentStrategy"""
+        if not self._enable_retry:
+            return strategy
+        on_retry = self._metrics.record_retry if self._metrics is not None else None
+        return RetryablePaymentStrategy(strategy, self._max_retries, on_retry)
+
+    def enable_idempotency(self, cache: IdempotencyCache = None):
+        """启用幂等处理：同一 reference 的支付只执行一次"""
+        self._idempotency = cache or IdempotencyCache()
+
+    def disable_idempotency(self):
+        """关闭幂等处理"""
+        self._idempotency = None
+
+    def enable_circuit_breaker(self, payment_type: PaymentType, fallback: PaymentType = None,
+                               breaker: CircuitBreaker = None, limiter: AIMDConcurrencyLimiter = None,
+                               adaptive_concurrency: bool = True):
+        """
+        为支付方式启用熔断与自适应限流
+        :param payment_type: 支付类型
+        :param fallback: 熔断或限流时改用的备用支付类型
+        :param breaker: 熔断器，默认 CircuitBreaker()
+        :param limiter: 并发限制器，默认 AIMDConcurrencyLimiter()
+        :param adaptive_concurrency: 是否启用并发限制
+        """
+        if fallback == payment_type:
+            raise ValueError("Fallback must differ from the guarded payment type")
+        if adaptive_concurrency:
+            limiter = limiter or AIMDConcurrencyLimiter()
+        else:
+            limiter = None
+        self._guards[payment_type] = (breaker or CircuitBreaker(), limiter, fallback)
+
+    def disable_circuit_breaker(self, payment_type: PaymentType):
+        """关闭支付方式的熔断与限流"""
+        self._guards.pop(payment_type, None)
+
+    def circuit_state(self, payment_type: PaymentType) -> Optional[CircuitState]:
+        """支付方式当前的熔断状态，未启用时返回 None"""
+        guard = self._guards.get(payment_type)
+        return guard[0].state if guard else None
+
+    def _get_strategy(self, payment_type: PaymentType) -> IPaymentStrategy:
+        """获取策略，启用熔断时包装为 GuardedPaymentStrategy，启用指标时再包装为 InstrumentedPaymentStrategy"""
+        strategy = self._factory.get_strategy(payment_type)
+        guard = self._guards.get(payment_type)
+        if guard is not None:
+            breaker, limiter, fallback_type = guard
+            fallback = self._factory.get_strategy(fallback_type) if fallback_type is not None else None
+            strategy = GuardedPaymentStrategy(strategy, breaker, limiter, fallback)
+        if self._metrics is not None:
+            strategy = InstrumentedPaymentStrategy(strategy, self._metrics)
+        return strategy
+
+    def set_retry_scheduler(self, scheduler: RetryScheduler):
+        """设置 submit_payment 使用的重试调度器"""
+        self._scheduler = scheduler
+
+    def submit_payment(self, payment_type: PaymentType, request: PaymentRequest,
+                       deadline: float = None) -> Future:
+        """
+        非阻塞地提交支付请求
+        失败的请求交给重试调度器按退避时间重新派发，不占用工作线程
+        :param payment_type: 支付类型
+        :param request: 支付请求
+        :param deadline: 截止时间（秒），默认使用调度器的设置
+        :return: 结果为 PaymentResult 的 Future
+        """
+        try:
+            strategy = self._get_strategy(payment_type)
+        except Exception as e:
+            future = Future()
+            future.set_result(PaymentResult(
+                success=False,
+                message=f"Payment processing failed: {str(e)}",
+                processing_time=0
+            ))
+            return future
+
+        idempotency = self._idempotency
+        if idempotency is not None:
+            cached, pending = idempotency.begin(request.reference)
+            if pending is not None:
+                return _chain_future(pending)  # 调用方取消自己的 Future 不影响共享的 Future
+            if cached is not None:
+                future = Future()
+                future.set_result(cached)
+                return future
+
+        max_attempts = self._max_retries if self._enable_retry else 1
+        on_retry = self._metrics.record_retry if self._metrics is not None else None
+        try:
+            future = self._retry_scheduler().submit(strategy, request, max_attempts=max_attempts,
+                                                    deadline=deadline, on_retry=on_retry)
+        except BaseException as e:
+            if idempotency is not None:
+                idempotency.abort(request.reference, e)
+            raise
+        if idempotency is not None:
+            self._settle_on(future, idempotency, request.reference)
+        self._record_on(future, strategy.strategy_name, request)
+        return future
+
+    def _retry_scheduler(self) -> RetryScheduler:
+        if self._scheduler is None:
+            self._scheduler = RetryScheduler()
+        return self._scheduler
+
+    @staticmethod
+    def _settle_on(future: Future, idempotency: IdempotencyCache, reference: str):
+        """future 完成时结束 reference 的幂等处理；被取消或出错时 abort，等待同一 reference 的调用不会永远阻塞"""
+        def settle(f: Future):
+            if f.cancelled():
+                idempotency.abort(reference, CancelledError())
+            elif f.exception() is not None:
+                idempotency.abort(reference, f.exception())
+            else:
+                idempotency.complete(reference, f.result())
+        future.add_done_callback(settle)
+
+    def _record_on(self, future: Future, strategy_name: str, request: PaymentRequest):
+        """启用账本时，future 正常完成后记录结果"""
+        ledger = self._ledger
+        if ledger is None:
+            return
+
+        def record(f: Future):
+            if not f.cancelled() and f.exception() is None:
+                ledger.record(strategy_name, request, f.result())
+        future.add_done_callback(record)
+
+    def shutdown(self):
+        """释放重试调度器"""
+        if self._scheduler is not None:
+            self._scheduler.shutdown()
+            self._scheduler = None
+
     def process_payment(self, payment_type: PaymentType, request: PaymentRequest) -> PaymentResult:
         """
         处理支付请求
@@ -318,16 +1558,356 @@ class PaymentProcessor:
         :param request: 支付请求
         :return: 支付结果
         """
+        if self._idempotency is not None:
+            return self._idempotency.get_or_process(
+                request.reference, lambda: self._process_payment(payment_type, request))
+        return self._process_payment(payment_type, request)
+
+    def _process_payment(self, payment_type: PaymentType, request: PaymentRequest) -> PaymentResult:
+        strategy_name = payment_type.value
         try:
-            # 获取基础策略
-            strategy = self._factory.get_strategy(payment_type)
+            # 获取基础策略（启用熔断时已包装）
+            strategy = self._get_strategy(payment_type)
+            strategy_name = strategy.strategy_name
 
             # 应用重试装饰器（如果启用）
-            if self._enable_retry:
-                strategy = RetryablePaymentStrategy(strategy, self._max_retries)
+            strategy = self._with_retry(strategy)
 
             # 执行支付
+            result = strategy.process_payment(request)
+
+        except Exception as e:
+            result = PaymentResult(
+                success=False,
+                message=f"Payment processing failed: {str(e)}",
+                processing_time=0
+            )
+
+        if self._ledger is not None:
+            self._ledger.record(strategy_name, request, result)
+        return result
+
+    def process_batch(self, payments: Iterable[Tuple[PaymentType, PaymentRequest]],
+                      max_batch_size: int = 100, max_wait: float = 0.05) -> List[PaymentResult]:
+        """
+        批量处理支付请求
+        按支付类型分组成微批次，批次达到 max_batch_size 或最早的请求等待超过 max_wait 秒时提交；
+        支持批量接口的策略一次处理整批，其余策略逐笔处理。
+        :param payments: (支付类型, 支付请求) 序列，可以是逐步产生的迭代器；
+            迭代器在后台线程中读取，上游阻塞时等待超时的批次仍按时提交
+        :param max_batch_size: 微批次的最大请求数
+        :param max_wait: 微批次的最长等待时间（秒）
+        :return: 与输入顺序一致的结果列表，失败的请求各自返回失败结果
+
+        启用重试时，失败的请求交给重试调度器（见 submit_payment）按退避时间重试，不阻塞后续微批次，
+        全部批次提交后再等待这些重试的结果。
+        """
+        results: List[Optional[PaymentResult]] = []
+        deferred: List[Tuple[int, Future]] = []  # 结果稍后由 Future 给出的请求（重试中或由其他调用处理中）
+        pending: Dict[PaymentType, List[Tuple[int, PaymentRequest]]] = {}
+        opened_at: Dict[PaymentType, float] = {}
+
+        def next_expiry() -> Optional[float]:
+            return min(opened_at[t] for t in pending) + max_wait if pending else None
+
+        for item in self._arrivals(payments, next_expiry, max_batch_size):
+            if item is not None:
+                payment_type, request = item
+                index = len(results)
+                results.append(None)
+                batch = pending.setdefault(payment_type, [])
+                if not batch:
+                    opened_at[payment_type] = time.monotonic()
+                batch.append((index, request))
+                if len(batch) >= max_batch_size:
+                    self._flush_batch(payment_type, pending.pop(payment_type), results, deferred)
+
+            # 提交等待超时的批次（item 为 None 表示等待下一个请求时到了最早的超时时间）
+            now = time.monotonic()
+            expired = [t for t in pending if now - opened_at[t] >= max_wait]
+            for t in expired:
+                self._flush_batch(t, pending.pop(t), results, deferred)
+
+        for payment_type, batch in pending.items():
+            self._flush_batch(payment_type, batch, results, deferred)
+
+        for index, future in deferred:
+            try:
+                results[index] = future.result()
+            except Exception as e:
+                results[index] = PaymentResult(success=False, message=f"Payment processing failed: {str(e)}",
+                                               processing_time=0)
+        return results
+
+    @staticmethod
+    def _arrivals(payments: Iterable[Tuple[PaymentType, PaymentRequest]],
+                  next_expiry: Callable[[], Optional[float]], buffer_size: int):
+        """
+        逐个产生 payments 中的请求；等待下一个请求超过 next_expiry() 给出的时间点时产生 None
+        列表、元组等序列直接遍历；其他可迭代对象由后台线程读取到有界队列中，上游阻塞不会推迟批次超时
+        """
+        if isinstance(payments, collections.abc.Sequence):
+            yield from payments
+            return
+
+        items: "queue.Queue" = queue.Queue(maxsize=buffer_size)
+        done = object()
+        stopped = threading.Event()
+
+        def put(item) -> bool:
+            while not stopped.is_set():
+                try:
+                    items.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+
+        def read():
+            try:
+                for payment in payments:
+                    if not put((payment, None)):
+                        return
+            except BaseException as e:
+                put((done, e))
+            else:
+                put((done, None))
+
+        threading.Thread(target=read, name="payment-batch-reader", daemon=True).start()
+        try:
+            while True:
+                expiry = next_expiry()
+                try:
+                    if expiry is None:
+                        payment, error = items.get()
+                    else:
+                        payment, error = items.get(timeout=max(0.0, expiry - time.monotonic()))
+                except queue.Empty:
+                    yield None
+                    continue
+                if payment is done:
+                    if error is not None:
+                        raise error
+                    return
+                yield payment
+        finally:
+            stopped.set()  # 调用方提前退出时让读取线程结束
+
+    def _flush_batch(self, payment_type: PaymentType, batch: List[Tuple[int, PaymentRequest]],
+                     results: List[Optional[PaymentResult]], deferred: List[Tuple[int, Future]]):
+        """
+        提交一个微批次，把结果写回对应的输入位置；需要重试的请求以 (位置, Future) 加入 deferred
+        启用幂等处理时，已缓存或正在其他调用中处理的 reference 不进入批次，直接使用（等待）其结果
+        """
+        if self._idempotency is None:
+            self._run_batch(payment_type, batch, results, deferred)
+            return
+
+        misses, waiting = [], []
+        for index, request in batch:
+            cached, pending = self._idempotency.begin(request.reference)
+            if cached is not None:
+                results[index] = cached
+            elif pending is not None:
+                waiting.append((index, pending))  # 包括同一批次中重复的 reference
+            else:
+                misses.append((index, request))
+
+        start = len(deferred)
+        try:
+            self._run_batch(payment_type, misses, results, deferred)
+        finally:
+            retrying = dict(deferred[start:])
+            for index, request in misses:
+                if index in retrying:
+                    self._settle_on(retrying[index], self._idempotency, request.reference)
+                elif results[index] is not None:
+                    self._idempotency.complete(request.reference, results[index])
+                else:
+                    self._idempotency.abort(request.reference, RuntimeError("Batch processing aborted"))
+        deferred.extend(waiting)  # 只读取结果、不取消，可以直接使用共享的 Future
+
+    def _run_batch(self, payment_type: PaymentType, batch: List[Tuple[int, PaymentRequest]],
+                   results: List[Optional[PaymentResult]], deferred: List[Tuple[int, Future]]):
+        if not batch:
+            return
+        requests = [request for _, request in batch]
+        strategy_name = payment_type.value
+        try:
+            strategy = self._get_strategy(payment_type)
+            strategy_name = strategy.strategy_name
+        except Exception as e:
+            failed = PaymentResult(success=False, message=f"Payment processing failed: {str(e)}",
+                                   processing_time=0)
+            batch_results = [failed] * len(requests)
+        else:
+            batch_results = None
+            if strategy.supports_batch:
+                try:
+                    batch_results = strategy.process_batch(requests)
+                    if len(batch_results) != len(requests):
+                        raise ValueError("Batch result count mismatch")
+                except Exception:
+                    # 整批出错时改为逐笔处理，只让出错的请求失败
+                    batch_results = None
+            if self._enable_retry:
+                # 由重试调度器执行（批量接口中失败的请求直接从退避开始），不阻塞后续批次
+                batch_results = self._submit_retries(strategy, batch, batch_results, deferred)
+            elif batch_results is None:
+                batch_results = [self._process_one(strategy, request) for request in requests]
+
+        for (index, request), result in zip(batch, batch_results):
+            if result is None:
+                continue  # 结果由 deferred 中的 Future 给出
+            results[index] = result
+            if self._ledger is not None:
+                self._ledger.record(strategy_name, request, result)
+
+    def _submit_retries(self, strategy: IPaymentStrategy, batch: List[Tuple[int, PaymentRequest]],
+                        batch_results: Optional[List[PaymentResult]],
+                        deferred: List[Tuple[int, Future]]) -> List[Optional[PaymentResult]]:
+        """
+        把需要（重新）处理的请求提交给重试调度器，以 (位置, Future) 加入 deferred
+        :param batch_results: 批量接口的结果，为 None 表示逐笔处理
+        :return: 已经得到的结果，交给调度器的请求为 None
+        """
+        on_retry = self._metrics.record_retry if self._metrics is not None else None
+        scheduler = self._retry_scheduler()
+        merged: List[Optional[PaymentResult]] = []
+        for i, (index, request) in enumerate(batch):
+            failed = batch_results[i] if batch_results is not None else None
+            if failed is not None and failed.success:
+                merged.append(failed)
+                continue
+            try:
+                future = scheduler.submit(strategy, request, max_attempts=self._max_retries,
+                                          on_retry=on_retry, failed=failed)
+            except Exception as e:
+                merged.append(PaymentResult(success=False, message=f"Payment processing failed: {str(e)}",
+                                            processing_time=0))
+                continue
+            self._record_on(future, strategy.strategy_name, request)
+            deferred.append((index, future))
+            merged.append(None)
+        return merged
+
+    def _process_one(self, strategy: IPaymentStrategy, request: PaymentRequest) -> PaymentResult:
+        """逐笔处理，异常转换为失败结果"""
+        try:
             return strategy.process_payment(request)
+        except Exception as e:
+            return PaymentResult(
+                success=False,
+                message=f"Payment processing failed: {str(e)}",
+                processing_time=0
+            )
+
+    def list_available_payment_methods(self) -> Dict[str, str]:
+        """获取可用支付方式列表"""
+        return self._factory.get_all_strategies()
+
+
+class AsyncPaymentProcessor:
+    """
+    异步支付处理器
+    在单个事件循环上并发处理大量支付：原生异步策略直接 await，
+    旧的同步策略通过线程池桥接；每种支付方式由信号量限制同时在途的请求数。
+    """
+
+    def __init__(self, factory: PaymentStrategyFactory = None, default_concurrency: int = 100,
+                 bridge_workers: int = 32):
+        """
+        初始化异步支付处理器
+        :param factory: 策略工厂实例，如果为None则创建默认工厂
+        :param default_concurrency: 每种支付方式默认的最大在途请求数
+        :param bridge_workers: 执行同步策略的线程数
+        """
+        self._factory = factory or PaymentStrategyFactory()
+        self._default_concurrency = default_concurrency
+        self._limits: Dict[PaymentType, int] = {}
+        # 事件循环 -> {支付类型: 信号量}；信号量绑定在创建它的事件循环上，每个循环各用一组，
+        # 信号量持有循环的强引用，因此不能用 WeakKeyDictionary，改为在创建新组时清理已关闭的循环
+        self._semaphores: Dict[asyncio.AbstractEventLoop, Dict[PaymentType, asyncio.Semaphore]] = {}
+        self._bridge_workers = bridge_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._enable_retry = False
+        self._max_retries = 3
+
+    def set_concurrency_limit(self, payment_type: PaymentType, limit: int):
+        """设置某种支付方式的最大在途请求数"""
+        if limit < 1:
+            raise ValueError("Concurrency limit must be at least 1")
+        self._limits[payment_type] = limit
+        for semaphores in list(self._semaphores.values()):
+            semaphores.pop(payment_type, None)
+
+    def enable_retry(self, max_retries: int = 3):
+        """启用支付重试机制"""
+        self._enable_retry = True
+        self._max_retries = max_retries
+
+    def disable_retry(self):
+        """禁用支付重试机制"""
+        self._enable_retry = False
+
+    def _semaphore(self, payment_type: PaymentType) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        semaphores = self._semaphores.get(loop)
+        if semaphores is None:
+            for closed in [other for other in self._semaphores if other.is_closed()]:
+                del self._semaphores[closed]
+            semaphores = self._semaphores[loop] = {}
+        semaphore = semaphores.get(payment_type)
+        if semaphore is None:
+            limit = self._limits.get(payment_type, self._default_concurrency)
+            semaphore = semaphores[payment_type] = asyncio.Semaphore(limit)
+        return semaphore
+
+    async def _call(self, strategy: IPaymentStrategy, request: PaymentRequest) -> PaymentResult:
+        if strategy.is_native_async:
+            return await strategy.process_payment_async(request)
+        # 同步策略：放到专用线程池中执行，不阻塞事件循环
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self._bridge_workers,
+                                                thread_name_prefix="payment-bridge")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, strategy.process_payment, request)
+
+    async def _call_with_retry(self, payment_type: PaymentType, strategy: IPaymentStrategy,
+                               request: PaymentRequest) -> PaymentResult:
+        """
+        与 RetryablePaymentStrategy 相同的重试逻辑，但每次尝试都经过 _call，同步策略仍使用桥接线程池；
+        退避期间释放信号量，最后一次失败后不再等待
+        """
+        last_error = None
+        for attempt in range(1, self._max_retries + 1):
+            async with self._semaphore(payment_type):
+                result = await self._call(strategy, request)
+            if result.success:
+                return result
+            last_error = result.message
+            if attempt < self._max_retries:
+                await asyncio.sleep(2 ** attempt)
+
+        return PaymentResult(
+            success=False,
+            message=f"Failed after {self._max_retries} attempts. Last error: {last_error}",
+            processing_time=0
+        )
+
+    async def process_payment(self, payment_type: PaymentType, request: PaymentRequest) -> PaymentResult:
+        """
+        异步处理支付请求
+        :param payment_type: 支付类型
+        :param request: 支付请求
+        :return: 支付结果
+        """
+        try:
+            strategy = self._factory.get_strategy(payment_type)
+            if not self._enable_retry:
+                async with self._semaphore(payment_type):
+                    return await self._call(strategy, request)
+            return await self._call_with_retry(payment_type, strategy, request)
 
         except Exception as e:
             return PaymentResult(
@@ -336,6 +1916,16 @@ class PaymentProcessor:
                 processing_time=0
             )
 
+    async def process_many(self, payments: Iterable[Tuple[PaymentType, PaymentRequest]]) -> List[PaymentResult]:
+        """并发处理多笔支付，结果与输入顺序一致"""
+        return await asyncio.gather(*(self.process_payment(t, r) for t, r in payments))
+
+    def close(self):
+        """释放桥接线程池"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
     def list_available_payment_methods(self) -> Dict[str, str]:
         """获取可用支付方式列表"""
         return self._factory.get_all_strategies()
@@ -346,8 +1936,9 @@ class PaymentProcessor:
 if __name__ == "__main__":
     print("===== 支付策略工厂演示 =====")
 
-    # 1. 创建支付处理器（自动初始化工厂）
+    # 1. 创建支付处理器（自动初始化工厂），并预先实例化策略
     processor = PaymentProcessor()
+    PaymentStrategyFactory().warm()
 
     # 2. 查看可用支付方式
     print("\n可用支付方式:")
@@ -400,7 +1991,60 @@ if __name__ == "__main__":
     result = processor.process_payment(PaymentType.WECHAT_PAY, bad_request)
     print(f"最终结果: {result}")
 
-    # 7. 自动发现并注册策略
+    # 7. 批量提交
+    print("\n批量提交银行转账与微信支付:")
+    processor.disable_retry()
+    batch = [(PaymentType.BANK_TRANSFER, PaymentRequest(amount=100.0 + i, currency="CNY", reference=f"SETTLE-{i}"))
+             for i in range(5)]
+    batch.append((PaymentType.WECHAT_PAY, bad_request))
+    for result in processor.process_batch(batch):
+        print(f"- {result.success} {result.transaction_id or result.message}")
+
+    # 8. 熔断与备用支付方式
+    print("\n加密货币支付熔断后改用信用卡:")
+    processor.disable_retry()
+    processor.enable_circuit_breaker(PaymentType.CRYPTO, fallback=PaymentType.CREDIT_CARD,
+                                     breaker=CircuitBreaker(min_requests=1, latency_p99_ms=500))
+    for _ in range(2):
+        result = processor.process_payment(PaymentType.CRYPTO, payment_request)
+        print(f"结果: {result.transaction_id}，熔断状态: {processor.circuit_state(PaymentType.CRYPTO).value}")
+    processor.disable_circuit_breaker(PaymentType.CRYPTO)
+
+    # 9. 幂等处理
+    print("\n重复提交同一订单（幂等）:")
+    processor.enable_idempotency()
+    first = processor.process_payment(PaymentType.PAYPAL, payment_request)
+    second = processor.process_payment(PaymentType.PAYPAL, payment_request)
+    print(f"两次结果相同: {first is second}")
+    processor.disable_idempotency()
+
+    # 10. 指标
+    print("\n支付指标:")
+    metrics = processor.enable_metrics()
+    processor.process_payment(PaymentType.PAYPAL, payment_request)
+    processor.process_payment(PaymentType.WECHAT_PAY, bad_request)
+    print(metrics.to_prometheus())
+
+    # 11. 非阻塞重试
+    print("\n非阻塞重试（失败请求在调度器中等待，不占用线程）:")
+    processor.enable_retry(max_retries=3)
+    processor.set_retry_scheduler(RetryScheduler(base_delay=0.2, deadline=5.0))
+    future = processor.submit_payment(PaymentType.WECHAT_PAY, bad_request)
+    print("已提交，主线程无需等待")
+    print(f"最终结果: {future.result()}")
+    processor.shutdown()
+
+    # 12. 异步并发处理大量支付
+    print("\n异步并发处理1000笔PayPal支付:")
+    async_processor = AsyncPaymentProcessor()
+    async_processor.set_concurrency_limit(PaymentType.PAYPAL, 500)
+    requests = [PaymentRequest(amount=10.0, currency="USD", reference=f"ASYNC-{i}") for i in range(1000)]
+    start = time.time()
+    results = asyncio.run(async_processor.process_many((PaymentType.PAYPAL, r) for r in requests))
+    async_processor.close()
+    print(f"成功 {sum(r.success for r in results)} 笔，耗时 {time.time() - start:.2f}s")
+
+    # 13. 自动发现并注册策略
     print("\n尝试自动发现策略:")
     # 假设我们有一个payment_strategies模块包含策略类
     PaymentStrategyFactory.auto_register_strategies("payment_strategies")
\ No newline at end of file